@@ -1,96 +1,1400 @@
+import functools
+import heapq
+import itertools
+import math
+import time
+from array import array
+from collections import defaultdict
+
 from hlogedu.search.algorithm import Algorithm, Node, Solution
 from hlogedu.search.containers import PriorityQueue
 
+
+def successor_function(problem):
+    """
+    Returns problem.iter_successors if the problem provides it (only valid
+    successors, same labels as its actions) and problem.get_successors otherwise
+    """
+    return getattr(problem, "iter_successors", None) or problem.get_successors
+
+
+def memoize_heuristic(heuristic, cache_size):
+    """
+    Wraps the heuristic in an LRU cache of at most cache_size states
+    (no cache if cache_size is None)
+    """
+    if cache_size is None:
+        return heuristic
+    return functools.lru_cache(maxsize=cache_size)(heuristic)
+
+
+def instrument(metrics, heuristic, get_successors, fringe):
+    """
+    Wraps the hot-path callables and the fringe with the timers of metrics (an
+    object such as instrumentation.SearchMetrics). Returns
+    (heuristic, get_successors, make_node, sort_successors, fringe), which are
+    the original objects when metrics is None. heuristic, get_successors and
+    fringe may be None (e.g. searches without a heuristic) and stay None.
+    """
+    if metrics is None:
+        return heuristic, get_successors, Node, sorted, fringe
+    return (
+        metrics.timed("heuristic", heuristic) if heuristic is not None else None,
+        metrics.timed("successors", get_successors, materialize=True) if get_successors is not None else None,
+        metrics.timed("node", Node),
+        metrics.timed("sort", sorted),
+        metrics.timed_fringe(fringe) if fringe is not None else None,
+    )
+
+
+def report_metrics(solution, metrics):
+    """
+    Attaches the collected metrics (if any) to the solution
+    """
+    if metrics is not None:
+        metrics.finish()
+        solution.metrics = metrics
+    return solution
+
+
+def report_heuristic_cache(solution, heuristic):
+    """
+    Stores the hit/miss counts of a memoized heuristic in the solution
+    """
+    cache_info = getattr(heuristic, "cache_info", None)
+    if cache_info is not None:
+        info = cache_info()
+        solution.heuristic_hits = info.hits
+        solution.heuristic_misses = info.misses
+    return solution
+
+
+def weight_heuristic(heuristic, weight):
+    """
+    Returns weight * heuristic (f = g + w·h, weighted A*), or the heuristic
+    itself if weight is 1
+    """
+    if weight == 1:
+        return heuristic
+    if weight < 1:
+        raise ValueError("weight must be at least 1")
+    return lambda state: weight * heuristic(state)
+
+
+class Deadline:
+    """
+    Time budget of a search: calling it returns True once `seconds` have
+    passed since it was created. The clock is read on the first call and then
+    every `interval` calls, so it can be called once per expansion; a budget
+    of 0 (or less) is reached right away.
+    """
+
+    def __init__(self, seconds, interval=64):
+        self.end = time.perf_counter() + seconds
+        self.interval = interval
+        self.calls = 0
+        self.reached = seconds <= 0
+
+    def __call__(self):
+        if not self.reached and self.calls % self.interval == 0:
+            self.reached = time.perf_counter() >= self.end
+        self.calls += 1
+        return self.reached
+
+
+def start_deadline(deadline):
+    """
+    Deadline for a time budget of deadline seconds (None: no limit)
+    """
+    return Deadline(deadline) if deadline is not None else None
+
+
+def report_deadline(solution, deadline):
+    """
+    Marks in the solution whether the search stopped because of the deadline
+    """
+    solution.deadline_reached = deadline is not None and deadline.reached
+    return solution
+
+
+class IndexedHeap:
+    """
+    Binary heap with one entry per key (key(item), by default the item
+    itself) and an in-place decrease-key, so that its size is the size of the
+    open list. Equal priorities are popped in insertion order.
+    """
+
+    def __init__(self, key=None):
+        self.key = key if key is not None else (lambda item: item)
+        self.heap = []  # [prioridad, orden de inserción, elemento, clave]
+        self.position = {}  # clave → índice en heap
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+    def __contains__(self, item):
+        return self.key(item) in self.position
+
+    def push(self, item, priority):
+        """
+        Adds item, or replaces the entry with the same key if priority is
+        lower. Returns True if a new entry was added.
+        """
+        k = self.key(item)
+        i = self.position.get(k)
+        if i is None:
+            self.counter += 1
+            self.heap.append([priority, self.counter, item, k])
+            self.position[k] = len(self.heap) - 1
+            self.sift_up(len(self.heap) - 1)
+            return True
+        entry = self.heap[i]
+        if priority < entry[0]:
+            entry[0] = priority
+            entry[2] = item
+            self.sift_up(i)
+        return False
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            del self.position[last[3]]
+            return last[2]
+        top = heap[0]
+        heap[0] = last
+        self.position[last[3]] = 0
+        del self.position[top[3]]
+        self.sift_down(0)
+        return top[2]
+
+    def sift_up(self, i):
+        heap, position = self.heap, self.position
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if heap[parent][:2] <= entry[:2]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i][3]] = i
+            i = parent
+        heap[i] = entry
+        position[entry[3]] = i
+
+    def sift_down(self, i):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][:2] < heap[child][:2]:
+                child += 1
+            if entry[:2] <= heap[child][:2]:
+                break
+            heap[i] = heap[child]
+            position[heap[i][3]] = i
+            i = child
+        heap[i] = entry
+        position[entry[3]] = i
+
+
+class NodeTree:
+    """
+    Default storage of search nodes of the A* searches: one Node per generated
+    successor, linked into the search tree. Nodes are referred to by the Node
+    itself; NodeTable offers the same interface with integer indexes.
+    """
+
+    def __init__(self, encode=None):
+        self.encode = encode
+        self.make_node = Node
+        self.roots = []
+
+    @staticmethod
+    def fringe(decrease_key=False):
+        if decrease_key:
+            return IndexedHeap(key=lambda node: node.state)
+        return PriorityQueue(key=lambda node: node.state)
+
+    def add(self, state, key=None, action=None, g=0, parent=None):
+        """
+        Adds a node (key, the state code, is not stored) and returns it
+        """
+        if parent is None:
+            n = self.make_node(state)
+            self.roots.append(n)
+        else:
+            n = self.make_node(state, action, cost=g, parent=parent)
+            parent.add_successor(n)
+        return n
+
+    @staticmethod
+    def state(n):
+        return n.state
+
+    def key(self, n):
+        return n.state if self.encode is None else self.encode(n.state)
+
+    @staticmethod
+    def cost(n):
+        return n.cost
+
+    @staticmethod
+    def expanded(n, order):
+        n.expand_order = order
+
+    def solution(self, problem, goal=None):
+        if goal is None:
+            return Solution(problem, self.roots)
+        return Solution(problem, self.roots, solution_node=goal)
+
+
+class NodeTable:
+    """
+    Struct-of-arrays storage of search nodes, used by the compact mode of the
+    A* searches instead of one Node per generated successor. Node i is
+    described by states[i] (the state, or its code when the problem implements
+    the state codec), parents[i] (-1 for the roots), actions[i] (index in
+    labels), g[i], depths[i] and orders[i] (expansion order, -1 if it was not
+    expanded). Node objects are only built by materialize (solution path) and
+    tree (whole search tree, for the visualizer).
+    """
+
+    def __init__(self, decode=None):
+        self.decode = decode
+        self.make_node = Node
+        self.states = [] if decode is None else array("q")
+        self.parents = array("q")
+        self.actions = array("l")
+        self.g = []  # lista: conserva el tipo de los costes del problema
+        self.depths = array("l")
+        self.orders = array("l")
+        self.labels = []
+        self.label_ids = {}
+        self.roots = []
+
+    def __len__(self):
+        return len(self.parents)
+
+    def fringe(self, decrease_key=False):
+        if decrease_key:
+            return IndexedHeap(key=lambda i: self.states[i])
+        return IndexFringe()
+
+    def add(self, state, key=None, action=None, g=0, parent=None):
+        """
+        Adds a node and returns its index. key is what the table stores: the
+        state code if the table decodes states, the state itself otherwise.
+        """
+        if parent is None:
+            parent = -1
+        i = len(self.parents)
+        action_id = self.label_ids.get(action)
+        if action_id is None:
+            action_id = self.label_ids[action] = len(self.labels)
+            self.labels.append(action)
+        self.states.append(state if key is None else key)
+        self.parents.append(parent)
+        self.actions.append(action_id)
+        self.g.append(g)
+        self.depths.append(0 if parent < 0 else self.depths[parent] + 1)
+        self.orders.append(-1)
+        if parent < 0:
+            self.roots.append(i)
+        return i
+
+    def state(self, i):
+        key = self.states[i]
+        return key if self.decode is None else self.decode(key)
+
+    def key(self, i):
+        return self.states[i]
+
+    def cost(self, i):
+        return self.g[i]
+
+    def expanded(self, i, order):
+        self.orders[i] = order
+
+    def path(self, i):
+        """
+        Indexes of the nodes from the root to node i
+        """
+        path = []
+        while i >= 0:
+            path.append(i)
+            i = self.parents[i]
+        path.reverse()
+        return path
+
+    def materialize(self, goal=None):
+        """
+        Returns (roots, goal Node), building Node objects only for the roots
+        and the path to goal
+        """
+        roots = {r: self.make_node(self.state(r)) for r in self.roots}
+        for r, n in roots.items():
+            if self.orders[r] >= 0:
+                n.expand_order = self.orders[r]
+        if goal is None:
+            return list(roots.values()), None
+
+        path = self.path(goal)
+        n = roots[path[0]]
+        for i in path[1:]:
+            ns = self.make_node(self.state(i), self.labels[self.actions[i]], cost=self.g[i], parent=n)
+            n.add_successor(ns)
+            if self.orders[i] >= 0:
+                ns.expand_order = self.orders[i]
+            n = ns
+        return list(roots.values()), n
+
+    def tree(self):
+        """
+        Builds the whole search tree as Node objects and returns its roots
+        """
+        nodes = []
+        for i in range(len(self)):
+            parent = self.parents[i]
+            if parent < 0:
+                n = Node(self.state(i))
+            else:
+                n = Node(self.state(i), self.labels[self.actions[i]], cost=self.g[i], parent=nodes[parent])
+                nodes[parent].add_successor(n)
+            if self.orders[i] >= 0:
+                n.expand_order = self.orders[i]
+            nodes.append(n)
+        return [nodes[r] for r in self.roots]
+
+    def solution(self, problem, goal=None):
+        """
+        Solution of a compact search: only the path to goal is built as Nodes
+        """
+        roots, n = self.materialize(goal)
+        if n is None:
+            return Solution(problem, roots)
+        return Solution(problem, roots, solution_node=n)
+
+
+class IndexFringe:
+    """
+    Plain binary heap of NodeTable indexes: entries are (priority, index), so
+    equal priorities are popped in insertion order
+    """
+
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+    def push(self, i, priority):
+        heapq.heappush(self.heap, (priority, i))
+        return True
+
+    def pop(self):
+        return heapq.heappop(self.heap)[1]
+
+
+# Máximo número de códigos de estado con el que se usa el codec (los códigos
+# caben en un array("q")), y máximo con el que los costes g se guardan en un
+# buffer plano de num_codes posiciones en lugar de un diccionario por código
+MAX_STATE_CODES = 1 << 24
+MAX_FLAT_CODES = 1 << 16
+
+
+def state_codec(problem, max_codes=MAX_STATE_CODES):
+    """
+    Returns (encode_state, num_codes) if the problem implements the state
+    codec and its code space has at most max_codes codes, (None, 0) otherwise
+    """
+    encode = getattr(problem, "encode_state", None)
+    if encode is None:
+        return None, 0
+    num_codes = problem.num_state_codes()
+    if num_codes > max_codes:
+        return None, 0
+    return encode, num_codes
+
+
+def node_store(problem, compact, encode):
+    """
+    Storage of the search nodes: a NodeTable in compact mode (holding state
+    codes if encode is given), a NodeTree otherwise
+    """
+    if not compact:
+        return NodeTree(encode)
+    return NodeTable(problem.decode_state if encode is not None else None)
+
+
 class Tree_Astar(Algorithm):
     NAME = "my-tree-astar"
 
+    MAX_STATE_CODES = MAX_STATE_CODES
+
     def __init__(self, problem):
         super().__init__(problem)
 
-    def run(self, heuristic=None):
+    def state_codec(self):
+        return state_codec(self.problem, self.MAX_STATE_CODES)
+
+    def run(self, heuristic=None, cache_size=None, lazy=False, metrics=None, compact=False,
+            weight=1, deadline=None):
+        """
+        compact: store the search nodes in a NodeTable (self.nodes) and only
+        build Node objects for the solution path. Not compatible with lazy.
+        weight: weighted A* (f = g + weight·h); with an admissible heuristic
+        the cost of the solution is at most weight times the optimal one,
+        which is stored as solution.bound. Not compatible with lazy, which
+        needs f to never decrease along a path.
+        deadline: time budget in seconds; when it runs out the search stops
+        without a solution and solution.deadline_reached is True
+        """
+        if lazy and compact:
+            raise ValueError("lazy and compact cannot be combined")
+        if lazy and weight != 1:
+            raise ValueError("lazy and weight cannot be combined")
         if heuristic is None:
             heuristic = self.problem.heuristic
+        heuristic = memoize_heuristic(weight_heuristic(heuristic, weight), cache_size)
+        deadline = start_deadline(deadline)
+        solution = self.search(heuristic, lazy, metrics, compact, deadline)
+        if weight != 1:
+            solution.bound = weight
+        solution = report_deadline(solution, deadline)
+        return report_metrics(report_heuristic_cache(solution, heuristic), metrics)
 
-        expand_counter = 0
-        roots = [Node(s) for s in self.problem.get_start_states()]
-        self.fringe = PriorityQueue(key=lambda node: node.state)
+    def search(self, heuristic, lazy, metrics, compact=False, deadline=None):
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        get_successors = successor_function(self.problem)
+
+        # Nodos en un árbol de Nodes o, en modo compacto, en una NodeTable
+        # (con códigos enteros si el codec del problema cabe en ella)
+        encode = self.state_codec()[0] if compact else None
+        store = self.nodes = node_store(self.problem, compact, encode)
+
+        # Instrumentación opcional (sin coste si metrics es None)
+        heuristic, get_successors, store.make_node, sort_successors, self.fringe = instrument(
+            metrics, heuristic, get_successors, store.fringe()
+        )
+
+        # Evaluación diferida: f con la que entró cada nodo y si ya es la suya
+        pushed = {}
+        f = None
 
         # Inicializar fringe con nodos raíz
+        roots = [store.add(s, encode(s) if encode else None) for s in self.problem.get_start_states()]
+        fringe_size = len(roots)
         for n in roots:
-            if self.problem.is_goal_state(n.state):
-                n.expand_order = 0
-                return Solution(self.problem, roots, solution_node=n)
-            self.fringe.push(n, n.cost + heuristic(n.state))
+            s = store.state(n)
+            if self.problem.is_goal_state(s):
+                store.expanded(n, 0)
+                return store.solution(self.problem, n)
+            f = heuristic(s)
+            if lazy:
+                pushed[id(n)] = (f, True)
+            self.fringe.push(n, f)
 
         while self.fringe:
+            if deadline is not None and deadline():
+                break  # plazo agotado → terminar sin solución
             n = self.fringe.pop()
+            fringe_size -= 1
+            s = store.state(n)
+            g = store.cost(n)
+
+            # Evaluación diferida: calcular h al llegar a la cima y reinsertar
+            # el nodo si su f real es mayor que la de su padre
+            if lazy:
+                f, evaluated = pushed.pop(id(n))
+            if lazy and not evaluated:
+                f_real = g + heuristic(s)
+                if f_real > f:
+                    if metrics is not None:
+                        metrics.count("lazy_reinserts")
+                    pushed[id(n)] = (f_real, True)
+                    self.fringe.push(n, f_real)
+                    fringe_size += 1
+                    continue
 
             # Si es objetivo → devolver inmediatamente
-            if self.problem.is_goal_state(n.state):
-                return Solution(self.problem, roots, solution_node=n)
+            if self.problem.is_goal_state(s):
+                return store.solution(self.problem, n)
 
             # Expandir nodo
-            expand_counter += 1
-            n.expand_order = expand_counter
+            self.expand_counter += 1
+            store.expanded(n, self.expand_counter)
+            if metrics is not None:
+                metrics.on_expand(self.expand_counter, fringe_size)
 
             # Expandir sucesores en orden lexicográfico
-            for s, a, c in sorted(self.problem.get_successors(n.state), key=lambda x: x[0]):
-                ns = Node(s, a, cost=n.cost + c, parent=n)
-                n.add_successor(ns)
-                f_new = ns.cost + heuristic(ns.state)
-                self.fringe.push(ns, f_new)
+            for s_new, a, c in sort_successors(get_successors(s), key=lambda x: x[0]):
+                ns = store.add(s_new, encode(s_new) if encode else None, a, g + c, n)
+                self.generate_counter += 1
+                if lazy:
+                    pushed[id(ns)] = (f, False)
+                    self.fringe.push(ns, f)
+                else:
+                    self.fringe.push(ns, g + c + heuristic(s_new))
+                fringe_size += 1
+            self.max_fringe = max(self.max_fringe, fringe_size)
 
-        return Solution(self.problem, roots)
+        return store.solution(self.problem)
 
 class Graph_Astar(Algorithm):
     NAME = "my-graph-astar"
 
+    # Máximo número de códigos con el que se usa el codec, y con el que se
+    # reserva un buffer plano de costes
+    MAX_STATE_CODES = MAX_STATE_CODES
+    MAX_FLAT_CODES = MAX_FLAT_CODES
+
     def __init__(self, problem):
         super().__init__(problem)
 
-    def run(self, heuristic=None):
+    def state_codec(self):
+        """
+        Returns (encode_state, num_codes) if the problem implements the state
+        codec and its code space has at most MAX_STATE_CODES codes, (None, 0)
+        otherwise
+        """
+        return state_codec(self.problem, self.MAX_STATE_CODES)
+
+    def run(self, heuristic=None, cache_size=None, lazy=False, metrics=None,
+            decrease_key=False, compact=False, weight=1, deadline=None):
+        """
+        decrease_key: use an IndexedHeap fringe with one entry per state,
+        updated in place when a cheaper path is found (no stale entries).
+        Ties are broken by h, then by insertion order. Not compatible with
+        lazy, which relies on re-inserting nodes.
+        compact: store the search nodes in a NodeTable (self.nodes) and only
+        build Node objects for the solution path. Not compatible with lazy.
+        weight: weighted A* (f = g + weight·h); states are re-opened when a
+        cheaper path is found, and with an admissible heuristic the cost of
+        the solution is at most weight times the optimal one (solution.bound).
+        Not compatible with lazy, which needs f to never decrease along a path.
+        deadline: time budget in seconds; when it runs out the search stops
+        without a solution and solution.deadline_reached is True
+        """
+        if lazy and decrease_key:
+            raise ValueError("lazy and decrease_key cannot be combined")
+        if lazy and compact:
+            raise ValueError("lazy and compact cannot be combined")
+        if lazy and weight != 1:
+            raise ValueError("lazy and weight cannot be combined")
         if heuristic is None:
             heuristic = self.problem.heuristic
+        heuristic = memoize_heuristic(weight_heuristic(heuristic, weight), cache_size)
+        deadline = start_deadline(deadline)
+        solution = self.search(heuristic, lazy, metrics, decrease_key, compact, deadline)
+        if weight != 1:
+            solution.bound = weight
+        solution = report_deadline(solution, deadline)
+        return report_metrics(report_heuristic_cache(solution, heuristic), metrics)
 
-        expand_counter = 0
-        best_cost = {}
+    def search(self, heuristic, lazy, metrics, decrease_key=False, compact=False, deadline=None):
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        get_successors = successor_function(self.problem)
 
-        roots = [Node(s) for s in self.problem.get_start_states()]
-        self.fringe = PriorityQueue(key=lambda node: node.state)
+        # Coste g de cada estado, indexado por su código si el problema
+        # implementa el codec (por el estado si no): un buffer plano si el
+        # espacio de códigos es pequeño, un diccionario de los estados
+        # alcanzados si no (el camino se reconstruye con los padres de los nodos)
+        encode, num_codes = self.state_codec()
+        if encode is not None and num_codes <= self.MAX_FLAT_CODES:
+            best_cost = array("d", [math.inf]) * num_codes
+        else:
+            best_cost = defaultdict(lambda: math.inf)
+        self.best_cost = best_cost
+
+        # Nodos en un árbol de Nodes o, en modo compacto, en una NodeTable
+        # (con códigos enteros si hay codec); con decrease-key el fringe
+        # tiene una entrada por estado
+        store = self.nodes = node_store(self.problem, compact, encode)
+
+        # Instrumentación opcional (sin coste si metrics es None)
+        heuristic, get_successors, store.make_node, sort_successors, self.fringe = instrument(
+            metrics, heuristic, get_successors, store.fringe(decrease_key)
+        )
+
+        # Evaluación diferida: f con la que entró cada nodo y si ya es la suya
+        pushed = {}
+        f = None
 
         # Inicializar fringe con los nodos raíz
+        roots = [store.add(s, encode(s) if encode else None) for s in self.problem.get_start_states()]
+        fringe_size = 0
         for n in roots:
-            if self.problem.is_goal_state(n.state):
-                n.expand_order = 0
-                return Solution(self.problem, roots, solution_node=n)
-            f = n.cost + heuristic(n.state)
-            best_cost[n.state] = n.cost
-            self.fringe.push(n, f)
+            s = store.state(n)
+            if self.problem.is_goal_state(s):
+                store.expanded(n, 0)
+                return store.solution(self.problem, n)
+            h = heuristic(s)
+            f = h
+            best_cost[store.key(n)] = 0
+            if lazy:
+                pushed[id(n)] = (f, True)
+            if decrease_key:
+                fringe_size += self.fringe.push(n, (f, h))
+            else:
+                self.fringe.push(n, f)
+                fringe_size += 1
 
         while self.fringe:
+            if deadline is not None and deadline():
+                break  # plazo agotado → terminar sin solución
             n = self.fringe.pop()
+            fringe_size -= 1
+            key = store.key(n)
+            g = store.cost(n)
+
+            # Evaluación diferida: los nodos obsoletos se descartan sin
+            # calcular h; el resto se reinsertan si su f real es mayor
+            if lazy:
+                f, evaluated = pushed.pop(id(n))
+            if lazy and not evaluated:
+                if g > best_cost[key]:
+                    if metrics is not None:
+                        metrics.count("stale_pops")
+                    continue
+                f_real = g + heuristic(store.state(n))
+                if f_real > f:
+                    if metrics is not None:
+                        metrics.count("lazy_reinserts")
+                    pushed[id(n)] = (f_real, True)
+                    self.fringe.push(n, f_real)
+                    fringe_size += 1
+                    continue
 
             # Si es objetivo → devolver inmediatamente
-            if self.problem.is_goal_state(n.state):
-                return Solution(self.problem, roots, solution_node=n)
+            s = store.state(n)
+            if self.problem.is_goal_state(s):
+                return store.solution(self.problem, n)
 
             # Poda clásica: ignorar si ya tenemos mejor coste
-            if n.state in best_cost and n.cost > best_cost[n.state]:
+            if g > best_cost[key]:
+                if metrics is not None:
+                    metrics.count("stale_pops")
                 continue
 
             # Expandir nodo
-            expand_counter += 1
-            n.expand_order = expand_counter
-            best_cost[n.state] = n.cost
+            self.expand_counter += 1
+            store.expanded(n, self.expand_counter)
+            if metrics is not None:
+                metrics.on_expand(self.expand_counter, fringe_size)
+            best_cost[key] = g
 
             # Expandir sucesores en orden lexicográfico
-            for s, a, c in sorted(self.problem.get_successors(n.state), key=lambda x: x[0]):
-                g_new = n.cost + c
+            for s_new, a, c in sort_successors(get_successors(s), key=lambda x: x[0]):
+                g_new = g + c
+                s_key = encode(s_new) if encode else s_new
 
                 # Solo agregar al fringe si mejora el coste o es nuevo
-                if s not in best_cost or g_new < best_cost[s]:
-                    ns = Node(s, a, cost=g_new, parent=n)
-                    n.add_successor(ns)
-                    f_new = g_new + heuristic(s)
-                    self.fringe.push(ns, f_new)
-                    best_cost[s] = g_new  # actualizar coste
+                if g_new < best_cost[s_key]:
+                    ns = store.add(s_new, s_key if encode else None, a, g_new, n)
+                    self.generate_counter += 1
+                    if lazy:
+                        pushed[id(ns)] = (f, False)
+                        self.fringe.push(ns, f)
+                        fringe_size += 1
+                    elif decrease_key:
+                        # Decrease-key: si el estado ya está en el fringe se
+                        # actualiza su entrada en lugar de añadir otra
+                        h = heuristic(s_new)
+                        if self.fringe.push(ns, (g_new + h, h)):
+                            fringe_size += 1
+                        elif metrics is not None:
+                            metrics.count("decrease_keys")
+                    else:
+                        self.fringe.push(ns, g_new + heuristic(s_new))
+                        fringe_size += 1
+                    best_cost[s_key] = g_new  # actualizar coste
+                elif metrics is not None:
+                    metrics.count("duplicates")
+            self.max_fringe = max(self.max_fringe, fringe_size)
+
+        return store.solution(self.problem)
+
+
+class Tree_IDAstar(Algorithm):
+    NAME = "my-tree-idastar"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, table_size=None):
+        """
+        Iterative deepening over f = g + h thresholds. Only the current path
+        (and its successor iterators) is kept in memory; the nodes of the
+        solution path are linked into the roots when the goal is found.
+
+        table_size: if not None, maximum number of states in the transposition
+        table, which remembers the best g (and the iteration) each state was
+        expanded with, so worse or repeated visits are pruned
+        """
+        if heuristic is None:
+            heuristic = self.problem.heuristic
+
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        get_successors = successor_function(self.problem)
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        table = {}
+        self.iteration_expansions = []
+
+        for n in roots:
+            if self.problem.is_goal_state(n.state):
+                n.expand_order = 0
+                return Solution(self.problem, roots, solution_node=n)
+
+        threshold = min((n.cost + heuristic(n.state) for n in roots), default=math.inf)
+        iteration = 0
+
+        while threshold < math.inf:
+            iteration += 1
+            next_threshold = math.inf
+            iteration_start = self.expand_counter
+
+            for root in roots:
+                # Pila de (nodo, iterador de sucesores | None si aún no se ha expandido)
+                stack = [(root, None)]
+                while stack:
+                    n, successors = stack[-1]
+
+                    if successors is None:
+                        # Poda por umbral: recordar la menor f que lo supera
+                        f = n.cost + heuristic(n.state)
+                        if f > threshold:
+                            next_threshold = min(next_threshold, f)
+                            stack.pop()
+                            continue
+
+                        # Si es objetivo → enlazar el camino y devolver
+                        if self.problem.is_goal_state(n.state):
+                            self.iteration_expansions.append(self.expand_counter - iteration_start)
+                            node = n
+                            while node.parent is not None:
+                                node.parent.add_successor(node)
+                                node = node.parent
+                            return Solution(self.problem, roots, solution_node=n)
+
+                        # Tabla de transposición: podar si ya se expandió con
+                        # menor g, o con la misma g en esta iteración
+                        if table_size is not None:
+                            entry = table.get(n.state)
+                            if entry is not None and (
+                                entry[0] < n.cost or entry == (n.cost, iteration)
+                            ):
+                                stack.pop()
+                                continue
+                            if entry is not None or len(table) < table_size:
+                                table[n.state] = (n.cost, iteration)
+
+                        # Expandir nodo (sucesores en orden lexicográfico)
+                        self.expand_counter += 1
+                        n.expand_order = self.expand_counter
+                        successors = iter(sorted(get_successors(n.state), key=lambda x: x[0]))
+                        stack[-1] = (n, successors)
+
+                    successor = next(successors, None)
+                    if successor is None:
+                        stack.pop()
+                        continue
+                    s, a, c = successor
+                    stack.append((Node(s, a, cost=n.cost + c, parent=n), None))
+                    self.generate_counter += 1
+                    self.max_fringe = max(self.max_fringe, len(stack))
+
+            self.iteration_expansions.append(self.expand_counter - iteration_start)
+            threshold = next_threshold
+
+        return Solution(self.problem, roots)
+
+class MemoryNode:
+    """
+    Search node of Graph_SMAstar. Unlike Node, it can be dropped from the tree:
+    its parent then remembers its backed-up f in `forgotten`. Its successors
+    are generated one at a time: `successors` is the sorted list of
+    (state, action, cost) and `next` the index of the first one not generated
+    yet.
+    """
+
+    __slots__ = ("state", "action", "cost", "parent", "depth", "g", "f", "seq",
+                 "children", "forgotten", "successors", "next", "in_open", "version", "watchers")
+
+    def __init__(self, state, action=None, cost=0, parent=None, g=0, f=0, seq=0):
+        self.state = state
+        self.action = action
+        self.cost = cost  # coste del paso desde el padre
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.g = g
+        self.f = f
+        self.seq = seq
+        self.children = {}  # estado → hijo en memoria
+        self.forgotten = {}  # estado → f del hijo olvidado
+        self.successors = None
+        self.next = 0
+        self.in_open = False
+        self.version = 0
+        self.watchers = []  # (nodo, f) que no generaron este estado por ser más caros
+
+    def generated(self):
+        """
+        True once every successor has been generated at least once
+        """
+        return self.successors is not None and self.next == len(self.successors)
+
+
+class Graph_SMAstar(Algorithm):
+    NAME = "my-graph-smastar"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, max_nodes=100000, cache_size=None):
+        """
+        Simplified memory-bounded A* (SMA*, Russell 1992): at most max_nodes
+        search nodes are kept alive. The best open node (lowest f, deepest)
+        generates one successor per step. When the budget is full, the worst
+        leaf (highest f, shallowest) is dropped first. Its parent remembers
+        its f and is re-opened, so it can regenerate that successor later.
+        Once a node has generated all its successors, its f becomes the best
+        f of its successors (in memory or forgotten), and this is backed up
+        through its ancestors. A non-goal node at depth max_nodes - 1 gets
+        f = inf, because its path cannot be extended within the budget.
+        A state is not generated while a live node reaches it with a lower or
+        equal g; that node keeps a note, and when it is dropped the skipped
+        state becomes a forgotten successor that can be regenerated. A live
+        leaf is dropped for good when a cheaper path to its state is found. The solution is optimal (for an admissible
+        heuristic) whenever the optimal path fits in the budget. The search
+        fails once every open node has f = inf. Budgets close to the
+        solution depth make it regenerate the same subtrees many times. The
+        peak number of live nodes (never above max_nodes) is stored in
+        peak_nodes, also on the returned Solution.
+        """
+        if heuristic is None:
+            heuristic = self.problem.heuristic
+        heuristic = memoize_heuristic(heuristic, cache_size)
+        get_successors = successor_function(self.problem)
+        is_goal_state = self.problem.is_goal_state
+
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        self.open_min = []  # (clave, -profundidad, orden, versión, nodo): mejor primero
+        self.open_max = []  # (-clave, profundidad, -orden, versión, nodo): peor primero
+        self.open_size = 0
+        self.live = 0
+        self.index = {}  # estado → nodo vivo con menor g
+        self.counter = 0
+
+        start_states = self.problem.get_start_states()
+        if len(start_states) >= max_nodes:
+            raise ValueError("max_nodes must be greater than the number of start states")
+        roots = []
+        for s in start_states:
+            root = MemoryNode(s, g=0, f=heuristic(s), seq=self.next_seq())
+            roots.append(root)
+            self.index[s] = root
+            self.live += 1
+            self.open_push(root)
+        self.peak_nodes = self.live
+
+        while True:
+            b = self.open_pop_min()
+            if b is None:
+                solution = self.build_solution(roots, None)
+                break
+
+            # Si es objetivo → devolver inmediatamente
+            if is_goal_state(b.state):
+                solution = self.build_solution(roots, b)
+                break
+
+            # Siguiente sucesor de b: primero los no generados (en orden
+            # lexicográfico) y después el mejor de los olvidados
+            if b.successors is None:
+                self.expand_counter += 1
+                b.successors = self.successors(get_successors, b.state)
+                if not b.successors:
+                    self.backup(b)  # sin sucesores: callejón sin salida
+                    continue
+            if b.next < len(b.successors):
+                s, a, c = b.successors[b.next]
+                b.next += 1
+                f_forgotten = None
+            else:
+                s = min(b.forgotten, key=b.forgotten.get)
+                f_forgotten = b.forgotten.pop(s)
+                _, a, c = next(successor for successor in b.successors if successor[0] == s)
+
+            g_new = b.g + c
+            # f del sucesor, calculada antes de liberar memoria
+            if b.depth + 1 >= max_nodes - 1 and not is_goal_state(s):
+                # Un nodo no objetivo en la profundidad máxima no cabe en memoria
+                f_new = math.inf
+            else:
+                f_new = max(b.f, g_new + heuristic(s))
+            if f_forgotten is not None:
+                f_new = max(f_new, f_forgotten)
+
+            other = self.index.get(s)
+            if other is not None and other.g <= g_new:
+                # Otro nodo vivo llega igual o más barato: no generarlo, pero
+                # recordarlo en b si ese nodo desaparece de memoria
+                if f_new < math.inf:
+                    other.watchers.append((b, f_new))
+            else:
+                # Hoja viva con un camino más caro al mismo estado: ya no sirve
+                stale = None
+                if other is not None and other.g > g_new and not other.children and other.parent is not None:
+                    stale = other
+
+                # Liberar memoria sin propagar a través de b (su f se
+                # actualiza al final, ya con el nuevo sucesor)
+                if f_new < math.inf:
+                    if stale is not None:
+                        self.drop(stale, forget=False, stop=b)
+                    elif self.live >= max_nodes:
+                        worst = self.open_pop_max()
+                        if worst is None:
+                            f_new = math.inf  # solo queda el camino de b: no cabe
+                        else:
+                            self.drop(worst, stop=b)
+
+                if f_new < math.inf:
+                    ns = MemoryNode(s, a, cost=c, parent=b, g=g_new, f=f_new, seq=self.next_seq())
+                    b.children[s] = ns
+                    self.index[s] = ns
+                    self.live += 1
+                    self.generate_counter += 1
+                    self.open_push(ns)
+
+            # b sigue abierto mientras le queden sucesores fuera de memoria; si
+            # ya los generó todos, su f pasa a ser la mejor de sus sucesores
+            self.open_push(b)
+            if b.generated():
+                self.backup(b)
+
+            self.peak_nodes = max(self.peak_nodes, self.live)
+            self.max_fringe = max(self.max_fringe, self.open_size)
+
+            # Compactar los montículos cuando acumulan demasiadas entradas obsoletas
+            if len(self.open_min) + len(self.open_max) > 4 * self.open_size + 64:
+                self.compact()
+
+        solution.peak_nodes = self.peak_nodes
+        return solution
+
+    def next_seq(self):
+        self.counter += 1
+        return self.counter
+
+    @staticmethod
+    def successors(get_successors, state):
+        """
+        Successors of state in lexicographic order, keeping only the cheapest
+        action to each state (children and forgotten f are indexed by state)
+        """
+        cheapest = {}
+        for s, a, c in sorted(get_successors(state), key=lambda x: x[0]):
+            if s not in cheapest or c < cheapest[s][2]:
+                cheapest[s] = (s, a, c)
+        return list(cheapest.values())
+
+    @staticmethod
+    def open_key(n):
+        """
+        f with which n is in the open list: its own f while it has successors
+        not generated yet, the best forgotten f otherwise (inf: not open)
+        """
+        if n.successors is None or n.next < len(n.successors):
+            return n.f
+        return min(n.forgotten.values(), default=math.inf)
+
+    def open_push(self, n):
+        """
+        (Re-)inserts n in the open list with its current key, or removes it
+        if it has nothing left to generate
+        """
+        n.version += 1
+        key = self.open_key(n)
+        if key == math.inf:
+            if n.in_open:
+                n.in_open = False
+                self.open_size -= 1
+            return
+        if not n.in_open:
+            n.in_open = True
+            self.open_size += 1
+        heapq.heappush(self.open_min, (key, -n.depth, n.seq, n.version, n))
+        heapq.heappush(self.open_max, (-key, n.depth, -n.seq, n.version, n))
+
+    def open_pop_min(self):
+        while self.open_min:
+            *_, version, n = heapq.heappop(self.open_min)
+            if n.in_open and version == n.version:
+                n.in_open = False
+                self.open_size -= 1
+                return n
+        return None
+
+    def open_pop_max(self):
+        """
+        Returns the worst open leaf (roots and nodes that still have children
+        are never dropped)
+        """
+        skipped = []
+        worst = None
+        while self.open_max:
+            entry = heapq.heappop(self.open_max)
+            n = entry[-1]
+            if not n.in_open or entry[3] != n.version:
+                continue
+            skipped.append(entry)
+            if n.parent is None or n.children:
+                continue
+            worst = n
+            break
+        for entry in skipped:
+            heapq.heappush(self.open_max, entry)
+        return worst
+
+    def backup(self, n, stop=None):
+        """
+        Sets the f of n, which has generated all its successors, to the best
+        f of its successors (in memory or forgotten) and propagates the change
+        to its ancestors, up to (not including) stop. Nodes left without any
+        successor are dropped.
+        """
+        while n is not None and n is not stop and n.generated():
+            f = min(itertools.chain((m.f for m in n.children.values()), n.forgotten.values()),
+                    default=math.inf)
+            if f == n.f:
+                return
+            n.f = f
+            if f == math.inf and n.parent is not None:
+                self.drop(n, stop=stop)  # callejón sin salida (drop sigue con el padre)
+                return
+            n = n.parent
+
+    def drop(self, n, forget=True, stop=None):
+        """
+        Removes the leaf n and backs up its f to its parent, which is
+        re-opened to regenerate it (with forget=False the parent does not
+        regenerate it: n is reached more cheaply from another node). The
+        backup does not go through stop (see backup).
+        """
+        if n.in_open:
+            n.in_open = False
+            self.open_size -= 1
+        self.live -= 1
+        if self.index.get(n.state) is n:
+            del self.index[n.state]
+        parent = n.parent
+        del parent.children[n.state]
+        if forget and n.f < math.inf:
+            parent.forgotten[n.state] = min(parent.forgotten.get(n.state, math.inf), n.f)
+        self.open_push(parent)
+        self.backup(parent, stop)
+
+        # Los nodos que no generaron este estado por ser más caros pueden
+        # necesitarlo ahora: lo recuerdan como olvidado para regenerarlo
+        for w, f in n.watchers:
+            if self.is_live(w) and n.state not in w.children:
+                w.forgotten[n.state] = min(w.forgotten.get(n.state, math.inf), f)
+                self.open_push(w)
+                self.backup(w, stop)
+        n.watchers = []
+
+    @staticmethod
+    def is_live(n):
+        """
+        True if n is still in the tree (only leaves are dropped, so a node in
+        its parent's children has a live parent)
+        """
+        return n.parent is None or n.parent.children.get(n.state) is n
+
+    def compact(self):
+        def valid(entry):
+            return entry[-1].in_open and entry[3] == entry[-1].version
+
+        self.open_min = [entry for entry in self.open_min if valid(entry)]
+        self.open_max = [entry for entry in self.open_max if valid(entry)]
+        heapq.heapify(self.open_min)
+        heapq.heapify(self.open_max)
+
+    def build_solution(self, roots, goal):
+        """
+        Materializes the Node tree of the solution path only
+        """
+        nodes = {id(root): Node(root.state) for root in roots}
+        node_roots = list(nodes.values())
+        if goal is None:
+            return Solution(self.problem, node_roots)
+
+        path = []
+        m = goal
+        while m.parent is not None:
+            path.append(m)
+            m = m.parent
+        n = nodes[id(m)]
+        n.expand_order = 0
+        for order, m in enumerate(reversed(path), start=1):
+            ns = Node(m.state, m.action, cost=n.cost + m.cost, parent=n)
+            n.add_successor(ns)
+            n.expand_order = order
+            n = ns
+        return Solution(self.problem, node_roots, solution_node=n)
+
+
+class Graph_BeamSearch(Algorithm):
+    NAME = "my-graph-beam-search"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, width=100, cache_size=None, deadline=None):
+        """
+        Breadth-first beam search: every layer keeps only the `width`
+        successors with the lowest f = g + h (ties broken by h), and states
+        already reached with a lower or equal g are skipped. Memory is
+        proportional to width, but the search is incomplete and its solution
+        is not optimal in general. The cheapest goal of the first layer that
+        contains one is returned.
+
+        deadline: time budget in seconds (see Graph_Astar.run)
+        """
+        if heuristic is None:
+            heuristic = self.problem.heuristic
+        heuristic = memoize_heuristic(heuristic, cache_size)
+        deadline = start_deadline(deadline)
+        solution = self.search(heuristic, width, deadline)
+        return report_deadline(report_heuristic_cache(solution, heuristic), deadline)
+
+    def search(self, heuristic, width, deadline):
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        get_successors = successor_function(self.problem)
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        best_cost = {n.state: 0 for n in roots}
+        layer = roots
+        seq = 0
+
+        while layer:
+            # Si la capa contiene objetivos → devolver el más barato
+            goals = [n for n in layer if self.problem.is_goal_state(n.state)]
+            if goals:
+                n = min(goals, key=lambda node: node.cost)
+                if n.parent is None:
+                    n.expand_order = 0
+                return Solution(self.problem, roots, solution_node=n)
+
+            # Candidatos de la siguiente capa: estado → (f, h, orden, g, padre, acción)
+            candidates = {}
+            for n in layer:
+                if deadline is not None and deadline():
+                    return Solution(self.problem, roots)
+                self.expand_counter += 1
+                n.expand_order = self.expand_counter
+                for s, a, c in sorted(get_successors(n.state), key=lambda x: x[0]):
+                    g_new = n.cost + c
+                    if g_new >= best_cost.get(s, math.inf):
+                        continue
+                    other = candidates.get(s)
+                    if other is None or g_new < other[3]:
+                        h = heuristic(s)
+                        seq += 1
+                        candidates[s] = (g_new + h, h, seq, g_new, n, a)
+                    self.generate_counter += 1
+            self.max_fringe = max(self.max_fringe, len(candidates))
+
+            # Quedarse con los `width` mejores candidatos
+            layer = []
+            for s, (_, _, _, g_new, n, a) in heapq.nsmallest(
+                width, candidates.items(), key=lambda item: item[1][:3]
+            ):
+                ns = Node(s, a, cost=g_new, parent=n)
+                n.add_successor(ns)
+                best_cost[s] = g_new
+                layer.append(ns)
+
+        return Solution(self.problem, roots)
+
+
+class Graph_ARAstar(Algorithm):
+    NAME = "my-graph-arastar"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, weight=3.0, weight_step=0.5, cache_size=None, deadline=None,
+            on_solution=None):
+        """
+        Anytime Repairing A* (Likhachev et al.): a weighted A* search with
+        weight `weight` finds a first solution quickly, and then the weight is
+        decreased by weight_step and the search is repaired (reusing the g
+        values of the previous iterations) to find better solutions, until the
+        solution is proven optimal or the deadline (time budget in seconds)
+        runs out.
+
+        on_solution: optional callable, called with every Solution as soon as
+        it is found. Each one has the attributes weight (the weight of its
+        iteration), bound (a proven bound on cost / optimal cost, assuming an
+        admissible heuristic), expanded and elapsed.
+
+        Returns the last (best) solution, or a Solution without a goal if
+        none was found in time.
+        """
+        if heuristic is None:
+            heuristic = self.problem.heuristic
+        heuristic = memoize_heuristic(heuristic, cache_size)
+        deadline = start_deadline(deadline)
+
+        solution = None
+        for solution in self.iter_solutions(heuristic, weight, weight_step, deadline):
+            if on_solution is not None:
+                on_solution(solution)
+        if solution is None:
+            solution = Solution(self.problem, [Node(s) for s in self.problem.get_start_states()])
+        return report_deadline(report_heuristic_cache(solution, heuristic), deadline)
+
+    def iter_solutions(self, heuristic, weight=3.0, weight_step=0.5, deadline=None):
+        """
+        Generator of the improving solutions (see run)
+        """
+        if weight < 1:
+            raise ValueError("weight must be at least 1")
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        self.solutions = []  # (coste, cota, peso, expansiones, tiempo) de cada solución
+        start = time.perf_counter()
+        get_successors = successor_function(self.problem)
+        is_goal_state = self.problem.is_goal_state
+
+        start_states = self.problem.get_start_states()
+        g = {s: 0 for s in start_states}
+        parents = {}  # estado → (estado padre, acción, coste del paso)
+        h_values = {}
+
+        def h(s):
+            value = h_values.get(s)
+            if value is None:
+                value = h_values[s] = heuristic(s)
+            return value
+
+        # Mejor objetivo encontrado hasta ahora
+        goal, goal_g = None, math.inf
+        for s in start_states:
+            if is_goal_state(s) and goal is None:
+                goal, goal_g = s, 0
+
+        w = weight
+        open_list = IndexedHeap()
+        for s in start_states:
+            open_list.push(s, (w * h(s), h(s)))
+        closed = set()
+        inconsistent = set()  # estados cerrados cuya g mejoró en esta iteración
+
+        while True:
+            # ImprovePath: A* ponderado hasta que ningún estado abierto tenga
+            # menor clave que el mejor objetivo
+            timed_out = False
+            while open_list and goal_g > open_list.heap[0][0][0]:
+                if deadline is not None and deadline():
+                    timed_out = True
+                    break
+                s = open_list.pop()
+                closed.add(s)
+                if is_goal_state(s):
+                    continue
+                self.expand_counter += 1
+                for s_new, a, c in sorted(get_successors(s), key=lambda x: x[0]):
+                    g_new = g[s] + c
+                    if g_new < g.get(s_new, math.inf):
+                        g[s_new] = g_new
+                        parents[s_new] = (s, a, c)
+                        self.generate_counter += 1
+                        if g_new < goal_g and is_goal_state(s_new):
+                            goal, goal_g = s_new, g_new
+                        if s_new in closed:
+                            inconsistent.add(s_new)
+                        else:
+                            open_list.push(s_new, (g_new + w * h(s_new), h(s_new)))
+                self.max_fringe = max(self.max_fringe, len(open_list) + len(inconsistent))
+
+            if goal is None:
+                return  # sin solución (o sin tiempo para encontrar la primera)
+
+            # Cota demostrada: coste / mínimo de g + h entre los estados
+            # abiertos o inconsistentes (cota inferior del coste óptimo)
+            lower_bound = min(
+                (g[s] + h(s) for s in itertools.chain((entry[2] for entry in open_list.heap), inconsistent)),
+                default=math.inf,
+            )
+            if lower_bound >= goal_g:
+                bound = 1.0
+            elif lower_bound > 0:
+                bound = min(w, goal_g / lower_bound)
+            else:
+                bound = w
+            # Solo se publica la solución si mejora su coste o su cota
+            if not self.solutions or self.solutions[-1][:2] != (goal_g, bound):
+                solution = self.build_solution(start_states, parents, goal)
+                solution.weight = w
+                solution.bound = bound
+                solution.expanded = self.expand_counter
+                solution.elapsed = time.perf_counter() - start
+                self.solutions.append((goal_g, bound, w, self.expand_counter, solution.elapsed))
+                yield solution
+
+            if timed_out or bound <= 1:
+                return
+
+            # Siguiente iteración: menor peso, los inconsistentes vuelven a
+            # abiertos y se recalculan todas las claves
+            w = max(1.0, w - weight_step)
+            states = [entry[2] for entry in open_list.heap]
+            states.extend(inconsistent)
+            open_list = IndexedHeap()
+            for s in states:
+                open_list.push(s, (g[s] + w * h(s), h(s)))
+            closed.clear()
+            inconsistent.clear()
+
+    def build_solution(self, start_states, parents, goal):
+        """
+        Builds the Node path from a start state to goal
+        """
+        path = []
+        s = goal
+        while s in parents:
+            parent, a, c = parents[s]
+            path.append((s, a, c))
+            s = parent
+        roots = [Node(state) for state in start_states]
+        n = next(root for root in roots if root.state == s)
+        n.expand_order = 0
+        for order, (state, a, c) in enumerate(reversed(path), start=1):
+            ns = Node(state, a, cost=n.cost + c, parent=n)
+            n.add_successor(ns)
+            n.expand_order = order
+            n = ns
+        return Solution(self.problem, roots, solution_node=n)
@@ -0,0 +1,283 @@
+"""
+Batch solver: solves many independent instances over a persistent pool of
+worker processes and streams the results back as they complete.
+
+An instance spec is a JSON-friendly dict:
+
+    {"id": "maze-17",                          # optional (default: its index)
+     "problem": "Pacman",                      # Problem NAME or "module:Class"
+     "problem_kwargs": {"file": "maze.lay"},
+     "algorithm": "my-graph-astar",            # Algorithm NAME or "module:Class"
+     "algorithm_kwargs": {},                   # e.g. {"max_depth": 8} for my-tree-ids
+     "heuristic": "PacmanManhattanHeuristic",  # class of the problem module,
+                                               # "module:Class" or null
+     "run_kwargs": {},
+     "timeout": 10}                            # optional, overrides the default
+
+The specs are sent to the workers in chunks; every worker imports the problem
+and algorithm modules once and keeps them for the following chunks. The
+per-task timeout is enforced inside the worker with SIGALRM (not available on
+Windows, where it is ignored), so a slow task does not stop its worker.
+
+Example (from the repository root), one JSON spec per line in specs.jsonl:
+
+    python -m algorithms.batch specs.jsonl --workers 8 --timeout 10 > results.jsonl
+"""
+
+import argparse
+import collections
+import importlib
+import itertools
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from algorithms.replay import solution_actions
+
+
+# Módulos donde se buscan los NAME de problemas y algoritmos
+PROBLEM_MODULES = ("problems.pacman", "problems.nqueens", "problems.kiwis_and_dogs")
+ALGORITHM_MODULES = (
+    "algorithms.astar",
+    "algorithms.ids",
+    "algorithms.bidirectional",
+    "algorithms.local_search",
+    "algorithms.hda",
+)
+
+# Clases ya resueltas en este proceso: (referencia, módulos) → clase
+RESOLVED = {}
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+def resolve(reference, modules):
+    """
+    Returns the class named by reference: "module:Class", or the NAME (or
+    class name) of a class defined in one of modules
+    """
+    key = (reference, modules)
+    cls = RESOLVED.get(key)
+    if cls is not None:
+        return cls
+    if ":" in reference:
+        module_name, _, qualname = reference.partition(":")
+        cls = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+    else:
+        for module_name in modules:
+            module = importlib.import_module(module_name)
+            for value in vars(module).values():
+                if isinstance(value, type) and value.__module__ == module.__name__ and (
+                    getattr(value, "NAME", None) == reference or value.__name__ == reference
+                ):
+                    cls = value
+                    break
+            if cls is not None:
+                break
+        else:
+            raise ValueError(f"Unknown class: {reference}")
+    RESOLVED[key] = cls
+    return cls
+
+
+def on_alarm(signum, frame):
+    raise TaskTimeout()
+
+
+def solve_spec(spec, timeout=None, include_actions=False):
+    """
+    Solves one spec and returns its result dict (status "solved",
+    "no solution", "timeout" or "failed")
+    """
+    result = {
+        "id": spec.get("id"),
+        "problem": spec.get("problem"),
+        "algorithm": spec.get("algorithm"),
+        "heuristic": spec.get("heuristic"),
+        "status": "failed",
+        "cost": None,
+        "expanded": None,
+        "generated": None,
+        "wall_time": None,
+        "pid": os.getpid(),
+    }
+    timeout = spec.get("timeout", timeout)
+    use_alarm = timeout is not None and hasattr(signal, "setitimer")
+    start = time.perf_counter()
+    try:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, on_alarm)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        problem_cls = resolve(spec["problem"], PROBLEM_MODULES)
+        algorithm_cls = resolve(spec["algorithm"], ALGORITHM_MODULES)
+        problem = problem_cls(**spec.get("problem_kwargs", {}))
+        run_kwargs = dict(spec.get("run_kwargs", {}))
+        if spec.get("heuristic") is not None:
+            heuristic_cls = resolve(spec["heuristic"], (problem_cls.__module__,))
+            run_kwargs["heuristic"] = heuristic_cls(problem)
+        algorithm = algorithm_cls(problem, **spec.get("algorithm_kwargs", {}))
+        solution = algorithm.run(**run_kwargs)
+        actions, cost = solution_actions(solution)
+        result.update(
+            status="solved" if actions is not None else "no solution",
+            cost=cost,
+            expanded=getattr(algorithm, "expand_counter", None),
+            generated=getattr(algorithm, "generate_counter", None),
+        )
+        if include_actions:
+            result["actions"] = actions
+    except TaskTimeout:
+        result["status"] = "timeout"
+    except Exception as e:
+        result["error"] = repr(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["wall_time"] = time.perf_counter() - start
+    return result
+
+
+def solve_chunk(chunk, timeout=None, include_actions=False):
+    return [solve_spec(spec, timeout, include_actions) for spec in chunk]
+
+
+def failed_chunk(chunk, error):
+    return [
+        {
+            "id": spec.get("id"),
+            "problem": spec.get("problem"),
+            "algorithm": spec.get("algorithm"),
+            "heuristic": spec.get("heuristic"),
+            "status": "failed",
+            "error": repr(error),
+        }
+        for spec in chunk
+    ]
+
+
+def solve_batch(specs, max_workers=None, chunksize=1, timeout=None, include_actions=False, max_pending=None):
+    """
+    Solves every spec (see the module docstring) in a ProcessPoolExecutor and
+    yields their result dicts as their chunks complete (not in input order).
+
+    specs: iterable of spec dicts, consumed lazily (at most max_pending
+        chunks, by default twice the number of workers, are in flight)
+    chunksize: specs per task sent to a worker
+    timeout: default time budget of every spec in seconds (None: no limit)
+    include_actions: add the action labels of the solution to the results
+
+    If a worker process dies (e.g. killed for running out of memory) the pool
+    breaks and every chunk in flight gets a BrokenProcessPool, without telling
+    which one killed its worker. A new pool is started and those chunks are
+    retried once, one at a time in a separate single-worker pool, so a chunk
+    that crashes again only breaks that pool (and is reported as failed)
+    while the other chunks keep running.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * max_workers
+    numbered = (
+        spec if "id" in spec else dict(spec, id=i)
+        for i, spec in enumerate(specs)
+    )
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    # Pool de un solo proceso para los reintentos (se crea al necesitarlo)
+    retry_executor = None
+    # future → (chunk, si es un reintento)
+    pending = {}
+    retries = collections.deque()
+    try:
+        while True:
+            # Como mucho un reintento en vuelo y solo en su pool, para aislar
+            # al culpable sin romper el pool de los demás
+            if retries and not any(retried for _, retried in pending.values()):
+                if retry_executor is None:
+                    retry_executor = ProcessPoolExecutor(max_workers=1)
+                chunk = retries.popleft()
+                future = retry_executor.submit(solve_chunk, chunk, timeout, include_actions)
+                pending[future] = (chunk, True)
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(numbered, chunksize))
+                if not chunk:
+                    break
+                future = executor.submit(solve_chunk, chunk, timeout, include_actions)
+                pending[future] = (chunk, False)
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                chunk, retried = pending.pop(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool as e:
+                    if not retried:
+                        broken = True
+                        retries.append(chunk)
+                        continue
+                    # El reintento ha vuelto a romper su pool: se descarta
+                    retry_executor.shutdown(wait=False, cancel_futures=True)
+                    retry_executor = None
+                    results = failed_chunk(chunk, e)
+                except Exception as e:
+                    results = failed_chunk(chunk, e)
+                yield from results
+
+            if broken:
+                # El pool roto ya no acepta tareas: las tareas que terminaron
+                # antes de romperse se devuelven y el resto se reintenta una
+                # vez (el reintento en vuelo sigue en su propio pool)
+                for future, (chunk, retried) in list(pending.items()):
+                    if retried:
+                        continue
+                    del pending[future]
+                    error = future.exception()
+                    if error is None:
+                        yield from future.result()
+                    elif not isinstance(error, BrokenProcessPool):
+                        yield from failed_chunk(chunk, error)
+                    else:
+                        retries.append(chunk)
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if retry_executor is not None:
+            retry_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a batch of instances given as JSON lines.")
+    parser.add_argument("specs", nargs="?", default="-", help="JSON lines file with the specs (default: stdin).")
+    parser.add_argument("-o", "--output", default="-", help="JSON lines file for the results (default: stdout).")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=None, help="Default time budget per instance (s).")
+    parser.add_argument("--actions", action="store_true", help="Include the solution actions.")
+    args = parser.parse_args()
+
+    specs_file = sys.stdin if args.specs == "-" else open(args.specs)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        specs = (json.loads(line) for line in specs_file if line.strip())
+        for result in solve_batch(specs, args.workers, args.chunksize, args.timeout, args.actions):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if specs_file is not sys.stdin:
+            specs_file.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
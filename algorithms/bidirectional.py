@@ -0,0 +1,137 @@
+import heapq
+import itertools
+import math
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+
+from algorithms.astar import successor_function
+
+
+class BidirectionalSearch(Algorithm):
+    """
+    Bidirectional A* (front-to-end): bidirectional uniform-cost search, or
+    breadth-first search for unit costs, when no heuristics are given.
+
+    Searches forward from the start states and backward from the goal states at
+    the same time, always expanding the side with the smaller fringe. The
+    forward fringe is ordered by g + heuristic(s) (estimated cost to a goal)
+    and the backward one by g + backward_heuristic(s) (estimated cost from a
+    start state). Both heuristics must be admissible: every path through the
+    fringes costs at least the smallest f of either fringe, so the search
+    stops as soon as one of them reaches the cost of the best meeting point,
+    and states whose f already reaches it are not generated.
+    Problems opt in by implementing get_goal_states() and
+    get_predecessors(state), which yields the (previous_state, action, cost)
+    triples such that applying action to previous_state leads to state.
+    """
+
+    NAME = "my-bidirectional"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, backward_heuristic=None):
+        """
+        heuristic: estimated cost from a state to a goal (None: 0).
+        backward_heuristic: estimated cost from a start state to a state
+        (None: 0). Without heuristics this is bidirectional uniform-cost
+        search, which is only a baseline: on mazes it expands more nodes than
+        Graph_Astar with a good heuristic. With Manhattan heuristics both ways
+        it expands fewer than Graph_Astar on open random mazes, but not on
+        perfect mazes, where the corridors defeat both heuristics.
+        """
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        starts = self.problem.get_start_states()
+        roots = [Node(s) for s in starts]
+
+        for n in roots:
+            if self.problem.is_goal_state(n.state):
+                n.expand_order = 0
+                return Solution(self.problem, roots, solution_node=n)
+
+        expanders = (
+            successor_function(self.problem),
+            self.problem.get_predecessors,
+        )
+        zero = lambda s: 0
+        heuristics = (heuristic or zero, backward_heuristic or zero)
+        # Por cada sentido: coste g, enlace (estado, acción, coste) hacia la
+        # raíz de ese sentido y fringe de (f, orden de inserción, g, estado)
+        best_cost = ({}, {})
+        links = ({}, {})
+        fringes = ([], [])
+        counter = itertools.count()
+        for d, states in enumerate((starts, self.problem.get_goal_states())):
+            for s in states:
+                best_cost[d][s] = 0
+                links[d][s] = None
+                heapq.heappush(fringes[d], (heuristics[d](s), next(counter), 0, s))
+
+        best_total, meeting = math.inf, None
+        for s in starts:
+            if s in best_cost[1]:
+                best_total, meeting = 0, s
+
+        while fringes[0] and fringes[1]:
+            # Ningún camino a través de los fringes puede mejorar el encuentro:
+            # con heurísticas admisibles, cualquier camino cuesta al menos la f
+            # mínima de cada fringe
+            if max(fringes[0][0][0], fringes[1][0][0]) >= best_total:
+                break
+
+            # Expandir el sentido con el fringe más pequeño
+            d = 0 if len(fringes[0]) <= len(fringes[1]) else 1
+            _, _, g, s = heapq.heappop(fringes[d])
+            if g > best_cost[d][s]:
+                continue
+
+            self.expand_counter += 1
+            self.max_fringe = max(self.max_fringe, len(fringes[0]) + len(fringes[1]))
+            for t, a, c in expanders[d](s):
+                g_new = g + c
+                if g_new < best_cost[d].get(t, math.inf):
+                    best_cost[d][t] = g_new
+                    links[d][t] = (s, a, c)
+
+                    # Actualizar el mejor punto de encuentro
+                    g_other = best_cost[1 - d].get(t)
+                    if g_other is not None and g_new + g_other < best_total:
+                        best_total, meeting = g_new + g_other, t
+
+                    # Los estados que no pueden mejorar el encuentro no entran
+                    f = g_new + heuristics[d](t)
+                    if f < best_total:
+                        heapq.heappush(fringes[d], (f, next(counter), g_new, t))
+                        self.generate_counter += 1
+
+        if meeting is None:
+            return Solution(self.problem, roots)
+        return Solution(self.problem, roots, solution_node=self.build_path(roots, links, meeting))
+
+    def build_path(self, roots, links, meeting):
+        """
+        Builds the Node chain start → meeting → goal and returns its last node
+        """
+        # Mitad hacia delante: de la raíz al punto de encuentro
+        forward = []
+        s = meeting
+        while links[0][s] is not None:
+            parent, a, c = links[0][s]
+            forward.append((s, a, c))
+            s = parent
+        n = next(root for root in roots if root.state == s)
+        for s, a, c in reversed(forward):
+            ns = Node(s, a, cost=n.cost + c, parent=n)
+            n.add_successor(ns)
+            n = ns
+
+        # Mitad hacia atrás: del punto de encuentro al objetivo
+        s = meeting
+        while links[1][s] is not None:
+            s, a, c = links[1][s]
+            ns = Node(s, a, cost=n.cost + c, parent=n)
+            n.add_successor(ns)
+            n = ns
+        return n
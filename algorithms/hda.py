@@ -0,0 +1,307 @@
+"""
+Hash-distributed A* (HDA*, Kishimoto et al.) over several worker processes.
+
+Every state is owned by worker hash(state) % workers, which keeps its g value,
+its parent and its open list entry. Workers expand their own open lists and
+send the successors owned by other workers in batches over multiprocessing
+queues. The best goal found so far (the incumbent) is shared, and a worker is
+idle when its open list is empty or only holds nodes with f >= incumbent.
+
+Every worker also publishes the f of the top of its open list, and only
+expands while it is not above the lowest published one. Without this gate a
+worker that gets the CPU, or whose part of the state space is easier, runs
+ahead into nodes that A* never expands: on a 120x120 random maze four workers
+expanded 11694 nodes where one expands 1197. Gating on f alone lets every
+worker expand its share of the current f layer at the same time (3821 nodes
+with four workers); gating on (f, h), as A* breaks ties, expands fewer (1436)
+but makes the workers wait for whichever one holds the lowest (f, h), so they
+hardly run in parallel and add no speedup.
+
+Termination: every worker counts the batches it has sent and received in
+shared arrays and raises an idle flag before blocking on its queue (after
+flushing its outgoing batches). The parent process declares the search over
+when every worker is idle and the total sent equals the total received in two
+consecutive snapshots with the same counts, i.e. no batch is in transit. With
+an admissible heuristic the incumbent is then optimal.
+
+The solution path is traced afterwards by asking the owner of each state for
+its parent. Workers are forked so that they inherit the problem and the
+heuristic (which do not need to be picklable) and agree on hash().
+"""
+
+import heapq
+import itertools
+import math
+import multiprocessing
+import queue
+import time
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+
+from algorithms.astar import successor_function
+
+
+class HDAstar(Algorithm):
+    NAME = "my-hda-astar"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, workers=None, batch_size=8, expansions_per_poll=8, deadline=None):
+        """
+        workers: number of worker processes (default: multiprocessing.cpu_count())
+        batch_size: successors buffered per destination worker before sending
+        expansions_per_poll: expansions between two reads of the queue (all
+        the buffered successors are sent at that point too)
+        deadline: time budget in seconds; when it runs out the search stops
+        without a solution and solution.deadline_reached is True
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("HDAstar needs the fork start method")
+        if heuristic is None:
+            heuristic = self.problem.heuristic
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        ctx = multiprocessing.get_context("fork")
+        start_states = self.problem.get_start_states()
+        initial = [[] for _ in range(workers)]
+        for s in start_states:
+            initial[hash(s) % workers].append(s)
+
+        # Estado compartido: lotes enviados/recibidos y bandera de inactividad
+        # por trabajador, mejor coste encontrado y orden de parada
+        shared = {
+            "sent": ctx.RawArray("q", workers),
+            "received": ctx.RawArray("q", workers),
+            "idle": ctx.RawArray("b", workers),
+            "min_f": ctx.RawArray("d", [math.inf] * workers),
+            "incumbent": ctx.RawValue("d", math.inf),
+            "stop": ctx.RawValue("b", 0),
+            "lock": ctx.Lock(),
+        }
+        inboxes = [ctx.Queue() for _ in range(workers)]
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(
+                target=hda_worker,
+                args=(i, workers, self.problem, heuristic, initial[i], inboxes, results, shared,
+                      batch_size, expansions_per_poll),
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+
+        try:
+            deadline_reached = self.wait(processes, shared, deadline)
+            shared["stop"].value = 1
+            reports = [self.receive(results, processes) for _ in range(workers)]
+            reports.sort()
+
+            # Expansiones de cada trabajador (reparto de la carga)
+            self.worker_expansions = [report[1] for report in reports]
+            self.expand_counter = sum(self.worker_expansions)
+            self.generate_counter = sum(report[2] for report in reports)
+            self.max_fringe = sum(report[3] for report in reports)  # suma de los máximos locales
+
+            goals = [(report[5], report[4]) for report in reports if report[4] is not None]
+            if deadline_reached or not goals:
+                solution = Solution(self.problem, [Node(s) for s in start_states])
+            else:
+                _, goal = min(goals, key=lambda item: item[0])
+                solution = self.build_solution(start_states, goal, workers, inboxes, results, processes)
+        finally:
+            for inbox in inboxes:
+                inbox.put(("exit",))
+            for p in processes:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
+
+        solution.deadline_reached = deadline_reached
+        return solution
+
+    def wait(self, processes, shared, deadline):
+        """
+        Waits until the workers are done (see the module docstring). Returns
+        True if the deadline ran out first.
+        """
+        sent, received, idle = shared["sent"], shared["received"], shared["idle"]
+        end = time.perf_counter() + deadline if deadline is not None else math.inf
+        previous = None
+        while True:
+            time.sleep(0.001)
+            if time.perf_counter() >= end:
+                return True
+            for p in processes:
+                if p.exitcode is not None:
+                    raise RuntimeError(f"HDA* worker exited with code {p.exitcode}")
+            if not all(idle):
+                previous = None
+                continue
+            snapshot = (sum(sent), sum(received))
+            if snapshot[0] == snapshot[1] and snapshot == previous and all(idle):
+                return False
+            previous = snapshot
+
+    @staticmethod
+    def receive(results, processes):
+        while True:
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                for p in processes:
+                    if p.exitcode is not None:
+                        raise RuntimeError(f"HDA* worker exited with code {p.exitcode}")
+
+    def build_solution(self, start_states, goal, workers, inboxes, results, processes):
+        """
+        Traces the path back from goal asking the owner of every state for
+        its (parent, action, cost) and builds its Nodes
+        """
+        path = []
+        s = goal
+        while True:
+            inboxes[hash(s) % workers].put(("parent", s))
+            entry = self.receive(results, processes)
+            if entry is None:
+                break
+            parent, a, c = entry
+            path.append((s, a, c))
+            s = parent
+
+        roots = [Node(state) for state in start_states]
+        n = next(root for root in roots if root.state == s)
+        n.expand_order = 0
+        for order, (state, a, c) in enumerate(reversed(path), start=1):
+            ns = Node(state, a, cost=n.cost + c, parent=n)
+            n.add_successor(ns)
+            n.expand_order = order
+            n = ns
+        return Solution(self.problem, roots, solution_node=n)
+
+
+def hda_worker(i, workers, problem, heuristic, initial, inboxes, results, shared,
+               batch_size, expansions_per_poll):
+    """
+    Search loop of worker i (see the module docstring). After the search it
+    reports (i, expanded, generated, max open size, goal | None, goal g)
+    and then answers ("parent", state) requests until ("exit",).
+    """
+    sent, received, idle = shared["sent"], shared["received"], shared["idle"]
+    incumbent, stop, lock = shared["incumbent"], shared["stop"], shared["lock"]
+    min_f = shared["min_f"]
+    inbox = inboxes[i]
+    get_successors = successor_function(problem)
+    is_goal_state = problem.is_goal_state
+
+    g = {}
+    parents = {}  # estado → (estado padre, acción, coste del paso)
+    open_list = []  # (f, h, orden, g, estado)
+    seq = itertools.count()
+    outboxes = [[] for _ in range(workers)]
+    goal, goal_g = None, math.inf
+    expanded = generated = max_open = 0
+
+    def add(s, g_new, parent):
+        # Insertar un estado propio si mejora su coste
+        if g_new < g.get(s, math.inf):
+            g[s] = g_new
+            if parent is not None:
+                parents[s] = parent
+            h = heuristic(s)
+            heapq.heappush(open_list, (g_new + h, h, next(seq), g_new, s))
+
+    def flush(j):
+        inboxes[j].put(("states", outboxes[j]))
+        sent[i] += 1
+        outboxes[j] = []
+
+    def flush_all():
+        for j in range(workers):
+            if outboxes[j]:
+                flush(j)
+
+    def handle(message):
+        # La bandera se baja antes de contar el lote: mientras haya trabajo
+        # pendiente el proceso padre no puede dar la búsqueda por terminada
+        if message[0] == "states":
+            idle[i] = 0
+            received[i] += 1
+            for s, g_new, parent in message[1]:
+                add(s, g_new, parent)
+
+    for s in initial:
+        add(s, 0, None)
+
+    while not stop.value:
+        # Recibir los lotes pendientes sin bloquear
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            handle(message)
+
+        # Expandir hasta expansions_per_poll nodos con f < incumbente y sin
+        # pasar del menor f publicado por los trabajadores
+        gated = False
+        for _ in range(expansions_per_poll):
+            if not open_list or open_list[0][0] >= incumbent.value:
+                break
+            f = open_list[0][0]
+            min_f[i] = f
+            if f > min(min_f):
+                gated = True
+                break
+            _, _, _, g_n, s = heapq.heappop(open_list)
+            if g_n > g[s]:
+                continue  # entrada obsoleta
+            if is_goal_state(s):
+                with lock:
+                    if g_n < incumbent.value:
+                        incumbent.value = g_n
+                if g_n < goal_g:
+                    goal, goal_g = s, g_n
+                continue
+            expanded += 1
+            for s_new, a, c in get_successors(s):
+                generated += 1
+                owner = hash(s_new) % workers
+                if owner == i:
+                    add(s_new, g_n + c, (s, a, c))
+                else:
+                    outboxes[owner].append((s_new, g_n + c, (s, a, c)))
+                    if len(outboxes[owner]) >= batch_size:
+                        flush(owner)
+        max_open = max(max_open, len(open_list))
+        flush_all()
+
+        # Sin trabajo útil → publicar f infinito, marcarse inactivo y esperar
+        # un lote; con trabajo por encima del menor f → solo esperar
+        if not open_list or open_list[0][0] >= incumbent.value:
+            min_f[i] = math.inf
+            idle[i] = 1
+            try:
+                message = inbox.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            handle(message)
+        elif gated:
+            try:
+                message = inbox.get(timeout=0.001)
+            except queue.Empty:
+                continue
+            handle(message)
+
+    results.put((i, expanded, generated, max_open, goal, goal_g))
+
+    # Trazado del camino: responder con el padre de los estados propios
+    while True:
+        message = inbox.get()
+        if message[0] == "exit":
+            return
+        if message[0] == "parent":
+            results.put(parents.get(message[1]))
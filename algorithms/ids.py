@@ -1,6 +1,11 @@
+from collections import OrderedDict
+
 from hlogedu.search.algorithm import Algorithm, Node, Solution
 from hlogedu.search.containers import Stack
 
+from algorithms.astar import instrument, report_metrics, successor_function
+
+
 class TreeIDS(Algorithm):
     NAME = "my-tree-ids"
     
@@ -8,16 +13,55 @@ class TreeIDS(Algorithm):
         super().__init__(problem)
         self.max_depth = max_depth
     
-    def run(self, max_depth):
+    def run(self, max_depth=None, generator=False, metrics=None, dead_size=100000):
+        """
+        generator: use the depth-first mode (see depth_limited_search) instead
+        of a Stack fringe that holds every frontier sibling as a Node
+        metrics: optional instrumentation object (see instrumentation.py),
+        attached to the returned Solution
+        dead_size: maximum number of dead states remembered by the generator
+        mode (None: no limit, 0: none). Forgetting a dead state only means its
+        subtree is explored again in the next iterations, so a smaller limit
+        trades memory for repeated expansions.
+        """
+        return report_metrics(self.search(max_depth, generator, metrics, dead_size), metrics)
+
+    def search(self, max_depth, generator, metrics, dead_size):
         if max_depth is None:
             max_depth = self.max_depth
             
-        expand_counter = 0
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        self.iteration_expansions = []
+
+        # Instrumentación opcional (sin coste si metrics es None)
+        _, get_successors, make_node, sort_successors, _ = instrument(
+            metrics, None, successor_function(self.problem), None
+        )
+
+        if generator:
+            # Las raíces se crean una sola vez y se reutilizan en cada iteración
+            roots = [Node(s) for s in self.problem.get_start_states()]
+            dead = OrderedDict()
+            for depth_limit in range(max_depth + 1):
+                iteration_start = self.expand_counter
+                n, cutoff = self.depth_limited_search(
+                    roots, depth_limit, dead, get_successors, make_node, sort_successors, metrics, dead_size
+                )
+                self.iteration_expansions.append(self.expand_counter - iteration_start)
+                if n is not None:
+                    return Solution(self.problem, roots, solution_node=n, cutoff=False)
+                if not cutoff:
+                    break
+            return Solution(self.problem, roots, cutoff=cutoff)
         
         for depth_limit in range(max_depth + 1):
             cutoff = False
+            iteration_start = self.expand_counter
             roots = [Node(s) for s in self.problem.get_start_states()]
-            self.fringe = Stack()
+            self.fringe = instrument(metrics, None, None, Stack())[-1]
+            fringe_size = len(roots)
             
             # Inicializar fringe con raíces
             for n in roots:
@@ -28,9 +72,11 @@ class TreeIDS(Algorithm):
             
             while self.fringe:
                 n = self.fringe.pop()
+                fringe_size -= 1
 
                 # Si es objetivo → devolver inmediatamente
                 if self.problem.is_goal_state(n.state):
+                    self.iteration_expansions.append(self.expand_counter - iteration_start)
                     return Solution(self.problem, roots, solution_node=n, cutoff=False)
 
                 # Si llegamos al límite → marcar cutoff
@@ -39,17 +85,95 @@ class TreeIDS(Algorithm):
                     continue
                 
                 # Expandir nodo
-                expand_counter += 1
-                n.expand_order = expand_counter
+                self.expand_counter += 1
+                n.expand_order = self.expand_counter
+                if metrics is not None:
+                    metrics.on_expand(self.expand_counter, fringe_size)
 
                 # Expandir sucesores en orden lexicográfico
-                for s, a, c in sorted(self.problem.get_successors(n.state), key=lambda x: x[0]):
-                    ns = Node(s, a, cost=n.cost + c, parent=n)
+                for s, a, c in sort_successors(get_successors(n.state), key=lambda x: x[0]):
+                    ns = make_node(s, a, cost=n.cost + c, parent=n)
                     n.add_successor(ns)
                     self.fringe.push(ns)
+                    self.generate_counter += 1
+                    fringe_size += 1
+                self.max_fringe = max(self.max_fringe, fringe_size)
+
+            self.iteration_expansions.append(self.expand_counter - iteration_start)
             
             # Si no hubo cutoff → hemos terminado
             if not cutoff:
                 break
         
         return Solution(self.problem, roots, cutoff=cutoff)
+
+    def depth_limited_search(self, roots, depth_limit, dead, get_successors,
+                             make_node=Node, sort_successors=sorted, metrics=None, dead_size=None):
+        """
+        Depth-first search that only keeps the current path and one successor
+        iterator per level, visiting nodes in the same order as the Stack mode.
+        States whose whole subtree was explored without reaching the depth
+        limit are added to dead (an OrderedDict used as an LRU set of at most
+        dead_size states, None: no limit) and skipped in later iterations.
+
+        Returns (goal node | None, cutoff)
+        """
+        cutoff = False
+        for root in reversed(roots):
+            # Pila de [nodo, iterador de sucesores | None, hubo cutoff debajo]
+            stack = [[root, None, False]]
+            while stack:
+                frame = stack[-1]
+                n, successors = frame[0], frame[1]
+
+                if successors is None:
+                    # Subárbol ya recorrido entero sin objetivo ni cutoff
+                    if n.state in dead:
+                        dead.move_to_end(n.state)
+                        if metrics is not None:
+                            metrics.count("dead_skips")
+                        stack.pop()
+                        continue
+
+                    # Si es objetivo → enlazar el camino y devolver
+                    if self.problem.is_goal_state(n.state):
+                        node = n
+                        while node.parent is not None:
+                            node.parent.add_successor(node)
+                            node = node.parent
+                        return n, False
+
+                    # Si llegamos al límite → marcar cutoff
+                    if n.depth >= depth_limit:
+                        cutoff = True
+                        stack.pop()
+                        if stack:
+                            stack[-1][2] = True
+                        continue
+
+                    # Expandir nodo (mismo orden que al sacar de la Stack)
+                    self.expand_counter += 1
+                    n.expand_order = self.expand_counter
+                    if metrics is not None:
+                        metrics.on_expand(self.expand_counter, len(stack))
+                    successors = reversed(sort_successors(get_successors(n.state), key=lambda x: x[0]))
+                    frame[1] = successors
+
+                successor = next(successors, None)
+                if successor is None:
+                    stack.pop()
+                    if frame[2]:
+                        if stack:
+                            stack[-1][2] = True
+                    elif dead_size != 0:
+                        # Recordar el estado; si no cabe, olvidar el usado hace más tiempo
+                        dead[n.state] = None
+                        if dead_size is not None and len(dead) > dead_size:
+                            dead.popitem(last=False)
+                    continue
+                s, a, c = successor
+                stack.append([make_node(s, a, cost=n.cost + c, parent=n), None, False])
+                self.generate_counter += 1
+                self.max_fringe = max(self.max_fringe, len(stack))
+
+        return None, cutoff
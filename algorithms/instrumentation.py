@@ -0,0 +1,118 @@
+"""
+Opt-in instrumentation for the search loops.
+
+Pass a SearchMetrics instance as the `metrics` argument of Tree_Astar.run,
+Graph_Astar.run or TreeIDS.run. The algorithm wraps its hot-path callables
+(heuristic, successor generation, Node construction, sorting) and its fringe
+with the timers below, reports every expansion and counts special events
+(stale pops, duplicates, ...). Without metrics the loops use the original
+callables, so disabled instrumentation costs one `is None` test per expansion.
+The metrics are attached to the returned Solution as `solution.metrics`.
+"""
+
+import time
+from collections import Counter, defaultdict
+
+
+class SearchMetrics:
+    def __init__(self, progress=None, progress_interval=1.0):
+        """
+        progress: optional callable, called with this object at most every
+        progress_interval seconds while the search runs
+        """
+        self.counters = Counter()
+        self.calls = Counter()
+        self.timers = defaultdict(float)
+        # Número de expansiones por tamaño del fringe (cubos potencia de 2)
+        self.fringe_histogram = Counter()
+        self.expanded = 0
+        self.max_fringe = 0
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self._next_progress = self.start + progress_interval
+
+    def timed(self, phase, function, materialize=False):
+        """
+        Returns function wrapped with a call counter and a timer for phase.
+        With materialize, the result is turned into a list inside the timer
+        (for generators such as iter_successors).
+        """
+        timers, calls = self.timers, self.calls
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            result = function(*args, **kwargs)
+            if materialize:
+                result = list(result)
+            timers[phase] += clock() - start
+            calls[phase] += 1
+            return result
+
+        return wrapper
+
+    def timed_fringe(self, fringe):
+        return TimedFringe(fringe, self)
+
+    def count(self, event, amount=1):
+        self.counters[event] += amount
+
+    def on_expand(self, expanded, fringe_size):
+        self.expanded = expanded
+        if fringe_size > self.max_fringe:
+            self.max_fringe = fringe_size
+        self.fringe_histogram[fringe_size.bit_length()] += 1
+        if self.progress is not None:
+            now = time.perf_counter()
+            if now >= self._next_progress:
+                self.elapsed = now - self.start
+                self._next_progress = now + self.progress_interval
+                self.progress(self)
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+
+    def as_dict(self):
+        """
+        JSON-friendly summary. Histogram bucket "<2^k" counts the expansions
+        done with a fringe of size in [2^(k-1), 2^k).
+        """
+        return {
+            "elapsed": self.elapsed,
+            "expanded": self.expanded,
+            "max_fringe": self.max_fringe,
+            "counters": dict(self.counters),
+            "calls": dict(self.calls),
+            "timers": dict(self.timers),
+            "fringe_histogram": {
+                f"<2^{bucket}": count for bucket, count in sorted(self.fringe_histogram.items())
+            },
+        }
+
+    def __repr__(self):
+        phases = ", ".join(
+            f"{phase}={seconds:.3f}s/{self.calls[phase]}" for phase, seconds in sorted(self.timers.items())
+        )
+        return f"SearchMetrics(expanded={self.expanded}, elapsed={self.elapsed:.3f}s, {phases})"
+
+
+class TimedFringe:
+    """
+    Fringe proxy that times push/pop in the owning SearchMetrics
+    """
+
+    def __init__(self, fringe, metrics):
+        self.fringe = fringe
+        self.push = metrics.timed("push", fringe.push)
+        self.pop = metrics.timed("pop", fringe.pop)
+
+    def __bool__(self):
+        return bool(self.fringe)
+
+    def __len__(self):
+        return len(self.fringe)
+
+    def __getattr__(self, name):
+        return getattr(self.fringe, name)
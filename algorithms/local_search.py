@@ -0,0 +1,212 @@
+import random
+
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+
+from problems.nqueens import Board
+
+
+class MinConflicts(Algorithm):
+    """
+    Min-conflicts hill climbing for NQueensIterativeRepair.
+
+    Every step picks a random conflicted queen and moves it (a move_queen
+    action) to the row with fewer conflicts among `candidates` random rows
+    other than its own plus up to `candidates` empty rows (all the rows if
+    None). Moves that do not reduce the number of attacking pairs are
+    sideways moves; after `max_sideways` consecutive ones, or `max_steps`
+    steps, the search restarts from a fresh random board. That board is
+    reached from the start state by moving every queen whose row changes, so
+    the path of the returned Solution always starts at the start state and
+    can be replayed by the visualizer.
+
+    The search works on a single board whose row/diagonal counters are
+    updated in place with the Board helpers (Board.attacks, Board.shift),
+    and only records the (column, row) of every move: the Nodes of the path
+    are built once, at the end, with Board.moved (what move_queen returns).
+
+    It does not use a heuristic: progress is measured with the attacking
+    pairs of the board, which is what RepairHeuristic counts (twice).
+    """
+
+    NAME = "my-min-conflicts"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+
+    def run(self, heuristic=None, max_steps=None, max_restarts=10,
+            max_sideways=100, candidates=64, seed=None):
+        """
+        heuristic: ignored (accepted so that it can be run like the other
+        algorithms), see the class docstring.
+        candidates: number of random rows tried per step (at least 1), or
+        None to try every row
+        """
+        n_cols = self.problem.b_size
+        if candidates is not None and candidates < 1:
+            raise ValueError(f"candidates must be at least 1 or None, got {candidates}")
+        if max_steps is None:
+            max_steps = 4 * n_cols
+        if candidates is not None and candidates >= n_cols - 1:
+            candidates = None
+
+        rng = random.Random(seed)
+        self.expand_counter = 0
+        self.generate_counter = 0
+        self.max_fringe = 0
+        start = self.problem.board(self.problem.get_start_states()[0])
+        moves = []
+
+        for attempt in range(max_restarts + 1):
+            # Primer intento desde el estado inicial; los siguientes desde un
+            # tablero aleatorio nuevo, al que se llega moviendo las reinas
+            if attempt == 0:
+                board = list(start)
+                moves = []
+            else:
+                board = [rng.randrange(n_cols) for _ in range(n_cols)]
+                moves = [(col, row, None) for col, row in enumerate(board) if row != start[col]]
+
+            # Contadores de reinas por fila, diagonal y antidiagonal (se
+            # actualizan en el sitio) y número de pares que se atacan
+            initial = Board.from_rows(board)
+            counters, pairs = initial.counters, initial.pairs
+            row_count = counters[0]
+            attacks = Board.attacks
+
+            def queen_conflicts(col):
+                return attacks(counters, col, board[col]) - 3
+
+            # Columnas de las reinas en cada fila/diagonal, para saber qué
+            # reinas pasan a estar en conflicto tras cada movimiento
+            lines = ({}, {}, {})
+            for col, row in enumerate(board):
+                for line, key in zip(lines, (row, col - row, col + row)):
+                    line.setdefault(key, set()).add(col)
+            conflicted = [col for col in range(n_cols) if queen_conflicts(col)]
+            in_conflicted = set(conflicted)
+
+            # Filas vacías: cerca de la solución son casi las únicas sin
+            # conflictos, así que siempre se prueban junto a las aleatorias
+            empty_rows = [row for row in range(n_cols) if not row_count[row]]
+            empty_index = {row: i for i, row in enumerate(empty_rows)}
+            sideways = 0
+
+            for _ in range(max_steps):
+                # Si es objetivo → devolver inmediatamente
+                if pairs == 0:
+                    return self.build_solution(start, moves, solved=True)
+
+                # Elegir una reina en conflicto (la lista se depura de forma perezosa)
+                col = None
+                while col is None:
+                    i = rng.randrange(len(conflicted))
+                    if queen_conflicts(conflicted[i]):
+                        col = conflicted[i]
+                    else:
+                        in_conflicted.discard(conflicted[i])
+                        conflicted[i] = conflicted[-1]
+                        conflicted.pop()
+
+                # Fila con menos conflictos (empates al azar) entre filas
+                # distintas de la actual: se muestrea entre las n - 1 restantes
+                # (las vacías nunca la incluyen), así siempre hay candidatas
+                old_row = board[col]
+                if candidates is None:
+                    rows = [row for row in range(n_cols) if row != old_row]
+                else:
+                    rows = [row + (row >= old_row) for row in rng.sample(range(n_cols - 1), candidates)]
+                    if len(empty_rows) <= candidates:
+                        rows += empty_rows
+                    else:
+                        rows += rng.sample(empty_rows, candidates)
+                # Cambio en pares como en Board.counters_delta, con la parte
+                # de la fila actual calculada una sola vez
+                removed = queen_conflicts(col)
+                best_row, best_delta, ties = None, None, 0
+                for row in rows:
+                    delta = attacks(counters, col, row) - removed
+                    if best_delta is None or delta < best_delta:
+                        best_row, best_delta, ties = row, delta, 1
+                    elif delta == best_delta:
+                        ties += 1
+                        if rng.randrange(ties) == 0:
+                            best_row = row
+
+                # Si todas las filas empeoran, la reina se queda donde está
+                if best_delta > 0:
+                    sideways += 1
+                    if sideways > max_sideways:
+                        break
+                    continue
+
+                # Aplicar el movimiento sobre el tablero y sus contadores
+                self.expand_counter += 1
+                self.generate_counter += 1
+                Board.shift(counters, col, old_row, best_row)
+                board[col] = best_row
+                pairs += best_delta
+                moves.append((col, best_row, pairs))
+
+                # Las reinas que comparten fila/diagonal con la nueva posición
+                # (incluida la movida) pasan a estar en conflicto
+                for line, old_key, new_key in zip(
+                    lines,
+                    (old_row, col - old_row, col + old_row),
+                    (best_row, col - best_row, col + best_row),
+                ):
+                    line[old_key].discard(col)
+                    attackers = line.setdefault(new_key, set())
+                    if attackers:
+                        for other in attackers | {col}:
+                            if other not in in_conflicted:
+                                in_conflicted.add(other)
+                                conflicted.append(other)
+                    attackers.add(col)
+
+                # Actualizar las filas vacías
+                if best_row in empty_index:
+                    i = empty_index.pop(best_row)
+                    last = empty_rows.pop()
+                    if last != best_row:
+                        empty_rows[i] = last
+                        empty_index[last] = i
+                if not row_count[old_row]:
+                    empty_index[old_row] = len(empty_rows)
+                    empty_rows.append(old_row)
+
+                # Movimientos laterales limitados
+                if best_delta >= 0:
+                    sideways += 1
+                    if sideways > max_sideways:
+                        break
+                else:
+                    sideways = 0
+
+            if pairs == 0:
+                return self.build_solution(start, moves, solved=True)
+
+        return self.build_solution(start, moves, solved=False)
+
+    def build_solution(self, start, moves, solved):
+        """
+        Builds the Node path of the (col, row, pairs) moves from the start
+        board; pairs is None for the moves to a restart board
+        """
+        root = n = Node(start)
+        board = start
+        for order, (col, row, pairs) in enumerate(moves, start=1):
+            if pairs is None:
+                # Sin pares conocidos: calcularlos con los contadores del
+                # tablero anterior, que después ya no se necesitan
+                new_board = board.moved(col, row)
+                new_board.counters
+                board.forget_counters()
+            else:
+                new_board = board.moved(col, row, pairs)
+            ns = Node(new_board, f"move_queen({col},{row})", cost=n.cost + 1, parent=n)
+            n.add_successor(ns)
+            n.expand_order = order
+            board, n = new_board, ns
+        if solved:
+            return Solution(self.problem, [root], solution_node=n)
+        return Solution(self.problem, [root])
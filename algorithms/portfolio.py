@@ -0,0 +1,136 @@
+"""
+Portfolio runner: solves the same problem with several algorithm/heuristic
+combinations in parallel worker processes and keeps the first solution found
+(or the cheapest one found within a time budget).
+
+Example (from the repository root):
+
+    python -m algorithms.portfolio maze.lay --timeout 10
+"""
+
+import argparse
+import contextlib
+import functools
+import os
+import time
+
+from algorithms.processes import run_processes
+from algorithms.replay import replay, solution_actions
+
+
+def solve(problem_factory, algorithm_cls, heuristic_cls=None, run_kwargs=None):
+    """
+    Builds the problem and solves it with one combination. Returns a
+    picklable report with the solution actions, cost, expansions and wall time.
+    """
+    start = time.perf_counter()
+    problem = problem_factory()
+    run_kwargs = dict(run_kwargs or {})
+    if heuristic_cls is not None:
+        run_kwargs["heuristic"] = heuristic_cls(problem)
+    algorithm = algorithm_cls(problem)
+    solution = algorithm.run(**run_kwargs)
+    actions, cost = solution_actions(solution)
+    return {
+        "actions": actions,
+        "cost": cost,
+        "expanded": getattr(algorithm, "expand_counter", None),
+        "wall_time": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+def run_portfolio(problem_factory, entries, mode="first", timeout=None, max_workers=None):
+    """
+    Runs every entry in its own worker process and returns (solution, reports).
+
+    problem_factory: picklable callable that builds the problem (e.g. a
+        functools.partial of the problem class). Every worker builds its own
+        instance, so problems seeded in __init__ get the same start state.
+    entries: list of (algorithm class, heuristic class | None, run kwargs | None)
+    mode: "first" keeps the first solution found, "best" the cheapest one
+        found before all workers finish or the timeout expires
+    timeout: time budget in seconds (None: no limit)
+
+    The rest of the workers are terminated as soon as the winner is known. The
+    winning Solution is rebuilt in this process by replaying its actions (None
+    if no worker found one). reports has one dict per entry with its status,
+    cost, expansions and wall time.
+    """
+    if mode not in ("first", "best"):
+        raise ValueError(f"Unknown portfolio mode: {mode}")
+
+    reports = []
+    for algorithm_cls, heuristic_cls, _ in entries:
+        reports.append({
+            "algorithm": algorithm_cls.NAME,
+            "heuristic": heuristic_cls.__name__ if heuristic_cls is not None else None,
+            "status": "cancelled",
+            "cost": None,
+            "expanded": None,
+            "wall_time": None,
+        })
+
+    winner = None
+    results = {}
+    calls = [(problem_factory, *entry) for entry in entries]
+    # Al cerrar el generador se terminan los procesos que siguen en marcha
+    with contextlib.closing(
+        run_processes(solve, calls, max_processes=max_workers or len(entries), timeout=timeout)
+    ) as completed:
+        for i, result, error in completed:
+            if error is not None:
+                reports[i]["status"] = "failed"
+                reports[i]["error"] = repr(error)
+                continue
+
+            results[i] = result
+            reports[i].update(
+                status="solved" if result["actions"] is not None else "no solution",
+                cost=result["cost"],
+                expanded=result["expanded"],
+                wall_time=result["wall_time"],
+            )
+            if result["actions"] is not None and (
+                winner is None or result["cost"] < results[winner]["cost"]
+            ):
+                winner = i
+            if mode == "first" and winner is not None:
+                break
+
+    if winner is None:
+        return None, reports
+    for i, report in enumerate(reports):
+        report["winner"] = i == winner
+    return replay(problem_factory(), results[winner]["actions"]), reports
+
+
+def main():
+    from algorithms.astar import Graph_Astar, Tree_Astar
+    from problems.pacman import PacmanProblem, PacmanEuclideanHeuristic, PacmanManhattanHeuristic
+
+    parser = argparse.ArgumentParser(description="Solve a Pacman maze with a portfolio of A* variants.")
+    parser.add_argument("file", help="File with the maze in the Pacman Project format.")
+    parser.add_argument("--mode", choices=("first", "best"), default="first")
+    parser.add_argument("--timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    entries = [
+        (algorithm_cls, heuristic_cls, None)
+        for algorithm_cls in (Graph_Astar, Tree_Astar)
+        for heuristic_cls in (PacmanManhattanHeuristic, PacmanEuclideanHeuristic)
+    ]
+    factory = functools.partial(PacmanProblem, args.file)
+    solution, reports = run_portfolio(factory, entries, mode=args.mode, timeout=args.timeout)
+
+    for report in reports:
+        print(
+            f"{report['algorithm']:<20} {str(report['heuristic']):<28} {report['status']:<12}"
+            f" cost={report['cost']} expanded={report['expanded']} wall_time={report['wall_time']}"
+        )
+    if solution is None:
+        print("No solution found")
+
+
+if __name__ == "__main__":
+    main()
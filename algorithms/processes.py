@@ -0,0 +1,82 @@
+"""
+Runs independent calls in worker processes that can be stopped at any time.
+
+concurrent.futures cannot cancel a task that is already running, so the
+portfolio runner and the benchmark suite start one multiprocessing.Process
+per call instead and terminate the ones still running when they are done.
+"""
+
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+
+
+def call(connection, func, args):
+    # Se ejecuta en el proceso hijo: envía (resultado, excepción) al padre
+    try:
+        outcome = (func(*args), None)
+    except Exception as e:
+        outcome = (None, e)
+    connection.send(outcome)
+    connection.close()
+
+
+def run_processes(func, calls, max_processes=None, timeout=None):
+    """
+    Runs func(*args) for every args in calls, each in a new process (at most
+    max_processes at a time, by default os.cpu_count()), and yields
+    (index in calls, result, exception | None) as the calls finish.
+
+    A process that dies without answering (e.g. killed for running out of
+    memory) yields a RuntimeError. The generator stops when timeout seconds
+    have passed (None: no limit); when it stops or is closed (use
+    contextlib.closing if the loop may break early) the processes still
+    running are terminated.
+    """
+    calls = list(calls)
+    max_processes = max_processes or os.cpu_count() or 1
+    end = time.monotonic() + timeout if timeout is not None else math.inf
+    waiting = iter(enumerate(calls))
+    running = {}  # conexión → (índice, proceso)
+    try:
+        while True:
+            while len(running) < max_processes:
+                item = next(waiting, None)
+                if item is None:
+                    break
+                i, args = item
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                # No daemónico: la llamada puede crear sus propios procesos
+                # (HDAstar); los que sigan vivos se terminan al salir
+                process = multiprocessing.Process(target=call, args=(sender, func, args))
+                process.start()
+                # Cerrar el extremo de escritura del padre para recibir EOF si el hijo muere
+                sender.close()
+                running[receiver] = (i, process)
+
+            if not running:
+                return
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            ready = multiprocessing.connection.wait(
+                list(running), timeout=None if remaining == math.inf else remaining
+            )
+            for receiver in ready:
+                i, process = running.pop(receiver)
+                try:
+                    result, error = receiver.recv()
+                except EOFError:
+                    process.join()
+                    result, error = None, RuntimeError(f"worker process exited with code {process.exitcode}")
+                receiver.close()
+                process.join()
+                yield i, result, error
+    finally:
+        for receiver, (_, process) in running.items():
+            process.terminate()
+        for receiver, (_, process) in running.items():
+            process.join()
+            receiver.close()
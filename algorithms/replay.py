@@ -0,0 +1,63 @@
+"""
+Helpers to move solutions between processes or to disk: a Solution is reduced
+to the action labels of its path and rebuilt by replaying them on the problem.
+"""
+
+from hlogedu.search.algorithm import Node, Solution
+
+from algorithms.astar import successor_function
+
+
+def solution_actions(solution):
+    """
+    Returns (actions, cost) of the solution path, or (None, None) if the
+    solution has no goal node
+    """
+    n = solution.solution_node
+    if n is None:
+        return None, None
+    cost = n.cost
+    actions = []
+    while n.parent is not None:
+        actions.append(n.action)
+        n = n.parent
+    actions.reverse()
+    return actions, cost
+
+
+def replay(problem, actions):
+    """
+    Rebuilds a Solution by applying the action labels from the first start
+    state they are valid for. No search is done: every action is applied with
+    problem.apply(state, label) -> (state, cost) | None when the problem
+    defines it, otherwise the successor with the given label is taken. Raises
+    ValueError if the actions do not apply to any start state.
+    """
+    roots = [Node(s) for s in problem.get_start_states()]
+    if actions is None:
+        return Solution(problem, roots)
+    get_successors = successor_function(problem)
+    apply = getattr(problem, "apply", None)
+    if apply is None:
+        def apply(state, action):
+            return next(((s, c) for s, a, c in get_successors(state) if a == action), None)
+
+    for root in roots:
+        n = root
+        for action in actions:
+            step = apply(n.state, action)
+            if step is None:
+                break
+            s, c = step
+            n = Node(s, action, cost=n.cost + c, parent=n)
+        else:
+            if not problem.is_goal_state(n.state):
+                continue
+            # Enlazar el camino en el árbol de la raíz
+            solution_node = n
+            while n.parent is not None:
+                n.parent.add_successor(n)
+                n = n.parent
+            return Solution(problem, roots, solution_node=solution_node)
+
+    raise ValueError("The actions do not lead from a start state to a goal state")
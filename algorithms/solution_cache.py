@@ -0,0 +1,215 @@
+"""
+Persistent on-disk cache of solutions: the action labels and cost of the
+solution found for a problem instance with an algorithm/heuristic
+combination. A hit rebuilds the Solution by replaying the actions on the
+problem, without searching.
+
+Problems opt in by implementing instance_key(), which returns a string that
+identifies the instance (e.g. a hash of the maze file, or n_queens and seed).
+The cache key also includes the algorithm, its arguments, the heuristic and a
+hash of the source files of the problem, algorithm and heuristic modules, so
+entries written before a code change are never returned (they are simply
+not found again and end up evicted).
+
+Example (from the repository root):
+
+    cache = SolutionCache(".solution-cache")
+    solution = cache.solve(PacmanProblem("maze.lay"), Graph_Astar, PacmanManhattanHeuristic)
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+from algorithms.replay import replay, solution_actions
+
+
+# Hash del código fuente de cada módulo: ruta → (mtime_ns, tamaño, hash)
+SOURCE_HASHES = {}
+
+
+def source_hash(obj):
+    """
+    Hash of the source file of the module that defines obj (a class)
+    """
+    module = sys.modules.get(obj.__module__)
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return obj.__module__
+    stat = os.stat(path)
+    cached = SOURCE_HASHES.get(path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        with open(path, "rb") as fh:
+            cached = (stat.st_mtime_ns, stat.st_size, hashlib.sha256(fh.read()).hexdigest())
+        SOURCE_HASHES[path] = cached
+    return cached[2]
+
+
+class SolutionCache:
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        """
+        directory: where the entries are stored (one JSON file per entry)
+        max_bytes: total size of the entries; the least recently used ones
+            are removed when a new entry exceeds it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Tamaño total de las entradas: se calcula en el primer put y se
+        # actualiza después sin recorrer el directorio (solo evict() lo
+        # recorre, y corrige así lo escrito por otros procesos)
+        self.total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, problem, algorithm_cls, heuristic_cls=None, run_kwargs=None, algorithm_kwargs=None):
+        """
+        Hex digest that identifies the instance, the combination and the
+        code that produced the solution
+        """
+        instance_key = getattr(problem, "instance_key", None)
+        if instance_key is None:
+            raise TypeError(f"{type(problem).__name__} does not implement instance_key()")
+        parts = [
+            f"{type(problem).__module__}.{type(problem).__qualname__}",
+            instance_key(),
+            source_hash(type(problem)),
+            algorithm_cls.NAME,
+            source_hash(algorithm_cls),
+            repr(sorted((algorithm_kwargs or {}).items())),
+            repr(sorted((run_kwargs or {}).items())),
+        ]
+        if heuristic_cls is not None:
+            parts += [f"{heuristic_cls.__module__}.{heuristic_cls.__qualname__}", source_hash(heuristic_cls)]
+        return hashlib.sha256("\0".join(map(str, parts)).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, problem, key):
+        """
+        Returns the cached Solution rebuilt on problem, or None on a miss. An
+        entry whose actions no longer replay on the problem is removed.
+        """
+        path = self.path(key)
+        try:
+            with open(path) as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        try:
+            solution = replay(problem, entry["actions"])
+        except (KeyError, ValueError):
+            self.remove(path)
+            return None
+        # Marcar la entrada como usada recientemente (para la expulsión LRU)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return solution
+
+    def put(self, key, solution, **info):
+        """
+        Stores the actions and cost of solution (also when it has no goal
+        node: the actions are then null); info adds JSON-friendly fields.
+        Entries larger than max_bytes are not stored (they would evict the
+        whole cache and then themselves).
+        """
+        actions, cost = solution_actions(solution)
+        entry = dict(info, actions=actions, cost=cost, created=time.time())
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(entry, fh)
+            size = fh.tell()
+        if size > self.max_bytes:
+            os.remove(tmp)
+            return
+        try:
+            old_size = os.stat(path).st_size
+        except OSError:
+            old_size = 0
+        os.replace(tmp, path)
+        if self.total_bytes is None:
+            self.total_bytes = sum(entry_size for _, entry_size, _ in self.entries())
+        else:
+            self.total_bytes += size - old_size
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def solve(self, problem, algorithm_cls, heuristic_cls=None, run_kwargs=None, algorithm_kwargs=None):
+        """
+        Returns the cached solution if there is one and runs the search
+        (storing its result) otherwise. The returned Solution has a cache_hit
+        attribute.
+        """
+        key = self.key(problem, algorithm_cls, heuristic_cls, run_kwargs, algorithm_kwargs)
+        solution = self.get(problem, key)
+        if solution is not None:
+            self.hits += 1
+            solution.cache_hit = True
+            return solution
+
+        self.misses += 1
+        run_kwargs = dict(run_kwargs or {})
+        if heuristic_cls is not None:
+            run_kwargs["heuristic"] = heuristic_cls(problem)
+        algorithm = algorithm_cls(problem, **(algorithm_kwargs or {}))
+        start = time.perf_counter()
+        solution = algorithm.run(**run_kwargs)
+        self.put(
+            key,
+            solution,
+            algorithm=algorithm_cls.NAME,
+            heuristic=heuristic_cls.__name__ if heuristic_cls is not None else None,
+            expanded=getattr(algorithm, "expand_counter", None),
+            wall_time=time.perf_counter() - start,
+        )
+        solution.cache_hit = False
+        return solution
+
+    def entries(self):
+        """
+        (path, size, last use) of every entry, least recently used first
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+        self.total_bytes = total
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            self.remove(path)
+        self.total_bytes = 0
+
+    def remove(self, path):
+        try:
+            size = os.stat(path).st_size
+            os.remove(path)
+        except OSError:
+            return
+        if self.total_bytes is not None:
+            self.total_bytes -= size
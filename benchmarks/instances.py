@@ -0,0 +1,184 @@
+"""
+Scalable instance generators for the benchmark suite.
+
+Every generator returns a picklable factory (a functools.partial) that builds
+the problem, so instances can be built inside the worker process that solves
+them. Pacman mazes are written to a directory as maze files.
+"""
+
+import functools
+import json
+import os
+import random
+
+from hlogedu.search.problem import Heuristic
+
+from problems.kiwis_and_dogs import KiwisAndDogsProblem
+from problems.nqueens import NQueensIterativeRepair
+from problems.pacman import PacmanMultiFoodProblem, PacmanProblem
+
+
+# Pacman
+##############################################################################
+
+
+def write_maze(grid, path):
+    with open(path, "w") as fh:
+        fh.write("\n".join("".join(row) for row in grid) + "\n")
+    return path
+
+
+def pacman_random(directory, rows, cols, wall_prob=0.25, seed=0):
+    """
+    Random walls with probability wall_prob, surrounded by a border of walls.
+    Pacman starts in the top-left corner and the food is in the bottom-right
+    one; a random monotone corridor between them keeps the maze solvable.
+    """
+    rng = random.Random(seed)
+    grid = [
+        ["%" if r in (0, rows - 1) or c in (0, cols - 1) or rng.random() < wall_prob else " "
+         for c in range(cols)]
+        for r in range(rows)
+    ]
+    r, c = 1, 1
+    while (r, c) != (rows - 2, cols - 2):
+        grid[r][c] = " "
+        if c == cols - 2 or (r < rows - 2 and rng.random() < 0.5):
+            r += 1
+        else:
+            c += 1
+    grid[1][1] = "P"
+    grid[rows - 2][cols - 2] = "."
+    name = f"random-{rows}x{cols}-{wall_prob}-{seed}.lay"
+    return functools.partial(PacmanProblem, write_maze(grid, os.path.join(directory, name)))
+
+
+def pacman_maze(directory, rows, cols, seed=0):
+    """
+    Perfect maze (one path between any two cells) carved with a randomized
+    depth-first search over the odd cells; rows and cols are rounded up to odd
+    numbers. Pacman starts in the top-left cell and the food is in the
+    bottom-right one.
+    """
+    rows, cols = rows | 1, cols | 1
+    rng = random.Random(seed)
+    grid = [["%"] * cols for _ in range(rows)]
+    grid[1][1] = " "
+    stack = [(1, 1)]
+    while stack:
+        r, c = stack[-1]
+        neighbours = [
+            (r + dr, c + dc)
+            for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < r + dr < rows - 1 and 0 < c + dc < cols - 1 and grid[r + dr][c + dc] == "%"
+        ]
+        if not neighbours:
+            stack.pop()
+            continue
+        nr, nc = rng.choice(neighbours)
+        grid[(r + nr) // 2][(c + nc) // 2] = " "
+        grid[nr][nc] = " "
+        stack.append((nr, nc))
+    grid[1][1] = "P"
+    grid[rows - 2][cols - 2] = "."
+    name = f"maze-{rows}x{cols}-{seed}.lay"
+    return functools.partial(PacmanProblem, write_maze(grid, os.path.join(directory, name)))
+
+
+def pacman_dots(directory, rows, cols, dots, wall_prob=0.2, seed=0):
+    """
+    Random walls with probability wall_prob, surrounded by a border of walls,
+    for PacmanMultiFoodProblem. Pacman starts in the top-left corner and the
+    dots are placed in random cells reachable from it.
+    """
+    rng = random.Random(seed)
+    grid = [
+        ["%" if r in (0, rows - 1) or c in (0, cols - 1) or rng.random() < wall_prob else " "
+         for c in range(cols)]
+        for r in range(rows)
+    ]
+    grid[1][1] = " "
+    reachable = []
+    seen = {(1, 1)}
+    stack = [(1, 1)]
+    while stack:
+        r, c = stack.pop()
+        reachable.append((r, c))
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if grid[nr][nc] == " " and (nr, nc) not in seen:
+                seen.add((nr, nc))
+                stack.append((nr, nc))
+    if len(reachable) <= dots:
+        raise ValueError(f"only {len(reachable) - 1} free cells are reachable for {dots} dots")
+    for r, c in rng.sample(sorted(reachable)[1:], dots):
+        grid[r][c] = "."
+    grid[1][1] = "P"
+    name = f"dots-{rows}x{cols}-{dots}-{wall_prob}-{seed}.lay"
+    return functools.partial(PacmanMultiFoodProblem, write_maze(grid, os.path.join(directory, name)))
+
+
+# N-Queens
+##############################################################################
+
+
+def nqueens(n_queens, seed=123456):
+    return functools.partial(NQueensIterativeRepair, n_queens, seed)
+
+
+# Kiwis and dogs
+##############################################################################
+
+
+def kiwis_and_dogs(kiwis=("D", "F"), dogs=("C",)):
+    """
+    Built-in kiwis-and-dogs graph with other start positions
+    """
+    return functools.partial(KiwisAndDogsProblem, kiwis=tuple(kiwis), dogs=tuple(dogs))
+
+
+def kiwis_and_dogs_random(directory, nodes, kiwis, dogs, degree=3, condition_prob=0.1, seed=0):
+    """
+    Random connected graph of `nodes` nodes (a random spanning tree plus extra
+    edges up to an average degree of `degree`) with symmetric costs 1-9. Each
+    edge gets a random nobody/somebody condition with probability
+    condition_prob. Kiwis go to the first node and dogs to the last one.
+    The instance is written to directory as a JSON file.
+    """
+    rng = random.Random(seed)
+    names = [f"N{i:02d}" for i in range(nodes)]
+    edges = set()
+    for i in range(1, nodes):
+        edges.add((rng.randrange(i), i))
+    while len(edges) < nodes * degree // 2:
+        a, b = rng.sample(range(nodes), 2)
+        edges.add((min(a, b), max(a, b)))
+
+    graph = []
+    for a, b in sorted(edges):
+        cost = rng.randint(1, 9)
+        for source, destination in ((a, b), (b, a)):
+            conditions = ""
+            if rng.random() < condition_prob:
+                conditions = f"{rng.choice(('nobody', 'somebody'))}({rng.choice(names)})"
+            graph.append([names[source], names[destination], cost, conditions])
+
+    instance = {
+        "edges": graph,
+        "kiwis": [rng.choice(names) for _ in range(kiwis)],
+        "dogs": [rng.choice(names) for _ in range(dogs)],
+        "kiwi_goal": names[0],
+        "dog_goal": names[-1],
+    }
+    path = os.path.join(directory, f"kiwis-{nodes}n-{kiwis}k{dogs}d-{seed}.json")
+    with open(path, "w") as fh:
+        json.dump(instance, fh)
+    return functools.partial(KiwisAndDogsProblem, path)
+
+
+class NullHeuristic(Heuristic):
+    """
+    h = 0, for problems without a registered heuristic
+    """
+
+    def compute(self, state):
+        return 0
@@ -0,0 +1,252 @@
+"""
+Benchmark suite for the algorithms in algorithms/.
+
+Every case (instance + algorithm + heuristic) runs in a fresh worker process
+and records the nodes expanded and generated, the peak fringe size, the peak
+RSS of the worker and the wall time. Results are written as JSON and/or CSV
+and can be compared against a stored baseline. The wall times of the HDA*
+cases are also printed as speedups over one worker and over Graph_Astar.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --json results.json --csv results.csv
+    python -m benchmarks.run --baseline baseline.json --threshold 0.1
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from algorithms.astar import Graph_ARAstar, Graph_Astar, Graph_BeamSearch, Tree_Astar, Tree_IDAstar
+from algorithms.bidirectional import BidirectionalSearch
+from algorithms.hda import HDAstar
+from algorithms.ids import TreeIDS
+from algorithms.local_search import MinConflicts
+from algorithms.processes import run_processes
+from benchmarks import instances
+from problems.kiwis_and_dogs import KiwisAndDogsDistanceHeuristic, KiwisAndDogsPDBHeuristic
+from problems.nqueens import RepairHeuristic
+from problems.pacman import (
+    PacmanFoodMSTHeuristic,
+    PacmanManhattanHeuristic,
+    PacmanMazeDistanceHeuristic,
+    PacmanStartManhattanHeuristic,
+)
+
+# Métricas comparadas con el baseline (mayor es peor en todas)
+METRICS = ("expanded", "generated", "max_fringe", "peak_rss_kb", "wall_time")
+
+
+@dataclass
+class Case:
+    name: str
+    problem_factory: Callable[[], Any]
+    algorithm_cls: type
+    heuristic_cls: type = None
+    algorithm_kwargs: dict = field(default_factory=dict)
+    run_kwargs: dict = field(default_factory=dict)
+    backward_heuristic_cls: type = None
+
+
+def default_suite(directory):
+    """
+    Cases for every problem and algorithm; directory receives the maze files
+    """
+    cases = []
+
+    pacman = [
+        ("pacman-random-40x40", instances.pacman_random(directory, 40, 40, seed=1)),
+        ("pacman-random-120x120", instances.pacman_random(directory, 120, 120, seed=2)),
+        ("pacman-maze-41x41", instances.pacman_maze(directory, 41, 41, seed=1)),
+        ("pacman-maze-121x121", instances.pacman_maze(directory, 121, 121, seed=2)),
+    ]
+    for name, factory in pacman:
+        cases.append(Case(f"{name}/graph-astar", factory, Graph_Astar, PacmanManhattanHeuristic))
+        cases.append(Case(f"{name}/graph-astar-maze-distance", factory, Graph_Astar,
+                          PacmanMazeDistanceHeuristic, run_kwargs={"decrease_key": True}))
+        cases.append(Case(f"{name}/bidirectional", factory, BidirectionalSearch))
+        cases.append(Case(f"{name}/bidirectional-astar", factory, BidirectionalSearch, PacmanManhattanHeuristic,
+                          backward_heuristic_cls=PacmanStartManhattanHeuristic))
+    large_name, large_factory = pacman[1]
+    cases.append(Case(f"{large_name}/graph-weighted-astar", large_factory, Graph_Astar,
+                      PacmanManhattanHeuristic, run_kwargs={"weight": 2}))
+    cases.append(Case(f"{large_name}/beam", large_factory, Graph_BeamSearch, PacmanManhattanHeuristic,
+                      run_kwargs={"width": 50}))
+    cases.append(Case(f"{large_name}/arastar", large_factory, Graph_ARAstar, PacmanManhattanHeuristic,
+                      run_kwargs={"weight": 3, "deadline": 10}))
+    # Aceleración de HDA* con el número de procesos
+    for workers in (1, 2, 4, 8):
+        cases.append(Case(f"{large_name}/hda-astar-{workers}", large_factory, HDAstar,
+                          PacmanManhattanHeuristic, run_kwargs={"workers": workers}))
+    small_name, small_factory = pacman[0]
+    cases.append(Case(f"{small_name}/idastar", small_factory, Tree_IDAstar, PacmanManhattanHeuristic,
+                      run_kwargs={"table_size": 100000}))
+    for rows, dots in ((20, 12), (40, 20)):
+        factory = instances.pacman_dots(directory, rows, rows, dots, seed=1)
+        cases.append(Case(f"pacman-dots-{rows}x{rows}-{dots}/graph-astar-mst", factory, Graph_Astar,
+                          PacmanFoodMSTHeuristic, run_kwargs={"decrease_key": True}))
+
+    for n in (5, 6, 7):
+        factory = instances.nqueens(n, seed=n)
+        cases.append(Case(f"nqueens-{n}/graph-astar", factory, Graph_Astar, RepairHeuristic))
+    cases.append(Case("nqueens-5/tree-astar", instances.nqueens(5, seed=5), Tree_Astar, RepairHeuristic))
+    for n in (100, 1000, 5000):
+        cases.append(Case(f"nqueens-{n}/min-conflicts", instances.nqueens(n, seed=n), MinConflicts,
+                          RepairHeuristic, run_kwargs={"seed": 0}))
+
+    kiwis = [
+        ("kiwis-2k1d", instances.kiwis_and_dogs()),
+        ("kiwis-3k1d", instances.kiwis_and_dogs(("D", "F", "G"), ("C",))),
+        ("kiwis-2k2d", instances.kiwis_and_dogs(("D", "F"), ("C", "B"))),
+        ("kiwis-3k2d", instances.kiwis_and_dogs(("D", "F", "G"), ("C", "B"))),
+        ("kiwis-12n-2k2d", instances.kiwis_and_dogs_random(directory, 12, 2, 2, seed=1)),
+    ]
+    for name, factory in kiwis:
+        cases.append(Case(f"{name}/graph-astar", factory, Graph_Astar, instances.NullHeuristic))
+        cases.append(Case(f"{name}/graph-astar-distance", factory, Graph_Astar, KiwisAndDogsDistanceHeuristic))
+    large = instances.kiwis_and_dogs_random(directory, 20, 3, 2, seed=2)
+    cases.append(Case("kiwis-20n-3k2d/graph-astar-distance", large, Graph_Astar, KiwisAndDogsDistanceHeuristic))
+    cases.append(Case("kiwis-20n-3k2d/graph-astar-pdb", large, Graph_Astar, KiwisAndDogsPDBHeuristic))
+    cases.append(Case("kiwis-2k1d/tree-ids", kiwis[0][1], TreeIDS,
+                      algorithm_kwargs={"max_depth": 8}, run_kwargs={"generator": True}))
+    return cases
+
+
+def run_case(case):
+    """
+    Solves one case (in the worker process) and returns its metrics
+    """
+    problem = case.problem_factory()
+    run_kwargs = dict(case.run_kwargs)
+    if case.heuristic_cls is not None:
+        run_kwargs["heuristic"] = case.heuristic_cls(problem)
+    if case.backward_heuristic_cls is not None:
+        run_kwargs["backward_heuristic"] = case.backward_heuristic_cls(problem)
+    algorithm = case.algorithm_cls(problem, **case.algorithm_kwargs)
+
+    start = time.perf_counter()
+    solution = algorithm.run(**run_kwargs)
+    wall_time = time.perf_counter() - start
+
+    n = solution.solution_node
+    return {
+        "case": case.name,
+        "solved": n is not None,
+        "cost": n.cost if n is not None else None,
+        "expanded": getattr(algorithm, "expand_counter", None),
+        "generated": getattr(algorithm, "generate_counter", None),
+        "max_fringe": getattr(algorithm, "max_fringe", None),
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        // (1024 if sys.platform == "darwin" else 1),
+        "wall_time": wall_time,
+    }
+
+
+def run_suite(cases, timeout=None):
+    results = []
+    for case in cases:
+        # Un proceso nuevo por caso para que el pico de RSS sea solo suyo
+        result = {"case": case.name, "error": "timeout"}
+        for _, outcome, error in run_processes(run_case, [(case,)], max_processes=1, timeout=timeout):
+            result = outcome if error is None else {"case": case.name, "error": repr(error)}
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns the (case, metric, baseline value, new value) tuples where the new
+    value is more than threshold (relative) above the baseline
+    """
+    previous = {result["case"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result["case"])
+        if base is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append((result["case"], metric, old, new))
+    return regressions
+
+
+def hda_speedups(results):
+    """
+    Returns the (case, speedup over 1 worker, speedup over graph-astar) of
+    every hda-astar-N case, as ratios of wall times (None if a reference case
+    did not run)
+    """
+    wall_times = {result["case"]: result.get("wall_time") for result in results}
+    speedups = []
+    for result in results:
+        instance, _, algorithm = result["case"].rpartition("/")
+        if not algorithm.startswith("hda-astar-") or result.get("wall_time") is None:
+            continue
+        ratios = []
+        for reference in (f"{instance}/hda-astar-1", f"{instance}/graph-astar"):
+            wall_time = wall_times.get(reference)
+            ratios.append(wall_time / result["wall_time"] if wall_time is not None else None)
+        speedups.append((result["case"], *ratios))
+    return speedups
+
+
+def write_csv(results, path):
+    columns = ["case", "solved", "cost", *METRICS, "error"]
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    parser.add_argument("--csv", help="Write the results to this CSV file.")
+    parser.add_argument("--baseline", help="JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative increase over the baseline flagged as a regression.")
+    parser.add_argument("--filter", default="", help="Only run the cases whose name contains this text.")
+    parser.add_argument("--timeout", type=float, default=None, help="Time limit per case in seconds.")
+    parser.add_argument("--mazes", default=None, help="Directory for the generated maze files.")
+    args = parser.parse_args()
+
+    directory = args.mazes or tempfile.mkdtemp(prefix="pacman-mazes-")
+    os.makedirs(directory, exist_ok=True)
+    cases = [case for case in default_suite(directory) if args.filter in case.name]
+    results = run_suite(cases, timeout=args.timeout)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    # Tiempo de HDA* frente a un solo trabajador y a Graph_Astar
+    for case, over_one, over_astar in hda_speedups(results):
+        print(f"SPEEDUP {case}: "
+              + ", ".join(f"{ratio:.2f}x over {reference}" for reference, ratio in
+                          (("1 worker", over_one), ("graph-astar", over_astar)) if ratio is not None))
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        for case, metric, old, new in regressions:
+            print(f"REGRESSION {case} {metric}: {old} -> {new}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
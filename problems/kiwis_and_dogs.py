@@ -1,6 +1,18 @@
+import functools
+import heapq
+import json
+import math
+from array import array
 from dataclasses import dataclass
 
-from hlogedu.search.problem import Problem, action, Categorical, DDRange
+from hlogedu.search.common import ClassParameter
+from hlogedu.search.problem import Problem, action, Categorical, DDRange, Heuristic
+
+
+"""
+Animals of the same kind are interchangeable, so the positions are kept as
+sorted tuples: every permutation of the same positions is the same State
+"""
 
 
 @dataclass(frozen=True, order=True)
@@ -11,46 +23,205 @@ class State:
 
 class KiwisAndDogsProblem(Problem):
     NAME = "kiwis-and-dogs"
+    PARAMS = [
+        ClassParameter(
+            "file",
+            type=str,
+            default=None,
+            help="JSON file with the graph, animals and goal nodes (default: built-in instance).",
+        ),
+        ClassParameter("kiwis", type=str, default=None, help="Start nodes of the kiwis, e.g. D,F."),
+        ClassParameter("dogs", type=str, default=None, help="Start nodes of the dogs, e.g. C."),
+        ClassParameter("kiwi_goal", type=str, default=None, help="Node the kiwis must reach."),
+        ClassParameter("dog_goal", type=str, default=None, help="Node the dogs must reach."),
+    ]
+
+    # Built-in instance: (source, destination) -> (cost, conditions)
+    GRAPH = {
+        ("A", "B"): (3, "nobody(E)"),
+        ("A", "C"): (4, ""),
+        ("B", "A"): (3, "nobody(E)"),
+        ("B", "C"): (1, ""),
+        ("B", "G"): (5, ""),
+        ("C", "B"): (1, ""),
+        ("C", "D"): (2, "somebody(E),somebody(G)"),
+        ("D", "C"): (2, "somebody(E),somebody(G)"),
+        ("D", "E"): (8, "somebody(A)"),
+        ("D", "F"): (3, "somebody(C)"),
+        ("E", "D"): (8, "somebody(A)"),
+        ("E", "F"): (5, ""),
+        ("F", "D"): (3, "somebody(C)"),
+        ("G", "F"): (7, ""),
+        ("G", "B"): (5, ""),
+    }
 
-    def __init__(self):
+    # Destination domain of the actions, so that their labels keep the node
+    # names. Instances of a graph with other nodes switch to a subclass whose
+    # actions range over their own nodes (see graph_class)
+    NODE_NAMES = ("A", "B", "C", "D", "E", "F", "G")
+
+    def __init__(self, file=None, kiwis=None, dogs=None, kiwi_goal=None, dog_goal=None):
+        """
+        file: JSON file with
+            {"edges": [[source, destination, cost, conditions], ...],
+             "kiwis": [start nodes], "dogs": [start nodes],
+             "kiwi_goal": node, "dog_goal": node}
+        where conditions is a string such as "nobody(E),somebody(G)" and
+        every key but "edges" is optional. The other arguments (lists of nodes
+        or comma-separated strings) override the file or the built-in
+        instance: 2 kiwis on D and F, 1 dog on C, kiwis to A and dogs to E.
+        """
         super().__init__()
-        self.graph = {
-            ("A", "B"): (3, "nobody(E)"),
-            ("A", "C"): (4, ""),
-            ("B", "A"): (3, "nobody(E)"),
-            ("B", "C"): (1, ""),
-            ("B", "G"): (5, ""),
-            ("C", "B"): (1, ""),
-            ("C", "D"): (2, "somebody(E),somebody(G)"),
-            ("D", "C"): (2, "somebody(E),somebody(G)"),
-            ("D", "E"): (8, "somebody(A)"),
-            ("D", "F"): (3, "somebody(C)"),
-            ("E", "D"): (8, "somebody(A)"),
-            ("E", "F"): (5, ""),
-            ("F", "D"): (3, "somebody(C)"),
-            ("G", "F"): (7, ""),
-            ("G", "B"): (5, ""),
-        }
-        self.num_kiwis = 2
-        self.num_dogs = 1
+        config = {}
+        if file is not None:
+            with open(file) as fh:
+                config = json.load(fh)
+            self.graph = {
+                (source, destination): (cost, conditions)
+                for source, destination, cost, conditions in config["edges"]
+            }
+        else:
+            self.graph = dict(self.GRAPH)
+
+        kiwis = self.parse_nodes(kiwis if kiwis is not None else config.get("kiwis", ("D", "F")))
+        dogs = self.parse_nodes(dogs if dogs is not None else config.get("dogs", ("C",)))
+        self.kiwi_goal = kiwi_goal or config.get("kiwi_goal", "A")
+        self.dog_goal = dog_goal or config.get("dog_goal", "E")
+        self.num_kiwis = len(kiwis)
+        self.num_dogs = len(dogs)
+
+        self.nodes = sorted({node for edge in self.graph for node in edge})
+        self.num_nodes = len(self.nodes)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        if tuple(self.nodes) != self.NODE_NAMES:
+            self.__class__ = graph_class(type(self), tuple(self.nodes))
+        for node in kiwis + dogs + (self.kiwi_goal, self.dog_goal):
+            if node not in self.node_index:
+                raise ValueError(f"Unknown node: {node}")
+        self.start_state = self.canonical(kiwis, dogs)
+        self.compile_graph()
+
+    @staticmethod
+    def parse_nodes(nodes):
+        if isinstance(nodes, str):
+            nodes = [node.strip() for node in nodes.split(",") if node.strip()]
+        return tuple(nodes)
+
+    def canonical(self, kiwis, dogs):
+        return State(kiwis=tuple(sorted(kiwis)), dogs=tuple(sorted(dogs)))
 
     def get_start_states(self):
-        # We start with ---> 2 KIWIS, one on node D and another on node F
-        #               ---> 1 DOG on node C
-        return [State(kiwis=("D", "F"), dogs=("C",))]
+        return [self.start_state]
+
+    def instance_key(self):
+        # Grafo, estados iniciales y objetivos (para algorithms.solution_cache)
+        return repr((sorted(self.graph.items()), self.get_start_states(), self.kiwi_goal, self.dog_goal))
 
     def is_goal_state(self, state):
         # Are all KIWIS in the TREE node and all DOGS in the BONE node?
-        return all(pos == "A" for pos in state.kiwis) and all(pos == "E" for pos in state.dogs)
+        return (all(pos == self.kiwi_goal for pos in state.kiwis)
+                and all(pos == self.dog_goal for pos in state.dogs))
 
     def is_valid_state(self, _):
         # There's no restrictions about the amount of animals in a single node
         return True
 
+    ###############
+    # STATE CODEC #
+    ###############
+
+    """
+    Every animal position is a digit in base len(self.nodes): kiwis first,
+    then dogs, the first kiwi being the most significant digit (only the codes
+    of sorted positions are ever used)
+    """
+
+    def num_state_codes(self):
+        return len(self.nodes) ** (self.num_kiwis + self.num_dogs)
+
+    def encode_state(self, state):
+        code = 0
+        for pos in state.kiwis + state.dogs:
+            code = code * len(self.nodes) + self.node_index[pos]
+        return code
+
+    def decode_state(self, code):
+        positions = []
+        for _ in range(self.num_kiwis + self.num_dogs):
+            code, digit = divmod(code, len(self.nodes))
+            positions.append(self.nodes[digit])
+        positions.reverse()
+        return State(kiwis=tuple(positions[:self.num_kiwis]), dogs=tuple(positions[self.num_kiwis:]))
+
     ###############
     #  AUX FUNC   #
     ###############
 
+    """
+    Compiles self.graph once into an adjacency index. Every condition is turned
+    into two bitmasks over self.nodes: the nodes that must be occupied
+    (somebody(X)) and the nodes that must be empty (nobody(X))
+        ---> self.moves       : source -> list of (destination, cost, required, forbidden)
+        ---> self.transitions : (source, destination) -> (cost, required, forbidden)
+    """
+
+    def compile_graph(self):
+        self.moves = {node: [] for node in self.nodes}
+        self.transitions = {}
+        for (source, destination), (cost, conditions) in self.graph.items():
+            required = forbidden = 0
+            for condition in conditions.split(","):
+                condition = condition.strip()
+                if not condition:
+                    continue
+                name, _, node = condition.partition("(")
+                mask = 1 << self.node_index[node.rstrip(")").strip()]
+                if name == "nobody":
+                    forbidden |= mask
+                elif name == "somebody":
+                    required |= mask
+                else:
+                    raise ValueError(f"Unknown condition: {condition}")
+            self.moves[source].append((destination, cost, required, forbidden))
+            self.transitions[(source, destination)] = (cost, required, forbidden)
+        for moves in self.moves.values():
+            moves.sort(key=lambda move: self.node_index[move[0]])
+
+    """
+    All-pairs shortest path costs between node indexes with every condition
+    relaxed (Floyd-Warshall over self.graph, computed once per problem)
+        ---> self.distances[i][j] : cost from self.nodes[i] to self.nodes[j], inf if unreachable
+    """
+
+    @functools.cached_property
+    def distances(self):
+        n = self.num_nodes
+        dist = [[0 if i == j else math.inf for j in range(n)] for i in range(n)]
+        for (source, destination), (cost, _) in self.graph.items():
+            i, j = self.node_index[source], self.node_index[destination]
+            dist[i][j] = min(dist[i][j], cost)
+        for k in range(n):
+            dist_k = dist[k]
+            for i in range(n):
+                d_ik = dist[i][k]
+                if d_ik == math.inf:
+                    continue
+                dist_i = dist[i]
+                for j in range(n):
+                    if d_ik + dist_k[j] < dist_i[j]:
+                        dist_i[j] = d_ik + dist_k[j]
+        return dist
+
+    """
+    Returns the bitmask of the nodes where there is at least one animal
+    """
+
+    def occupied(self, state):
+        mask = 0
+        for pos in state.kiwis + state.dogs:
+            mask |= 1 << self.node_index[pos]
+        return mask
+
     """ 
     Given a state and a current position, this method returns a list containing
     touples of the possible destinations and the associated cost of the
@@ -58,99 +229,273 @@ class KiwisAndDogsProblem(Problem):
     """
 
     def get_valid_moves(self, current_pos, state):
-        valid_pos = []
-        # We search on the graph the possible destinations we can go to from source
-        for (source, destination), (cost, conditions) in self.graph.items():
-            if source != current_pos:
-                # We don't take movements were source != current position
-                continue
+        occupied = self.occupied(state)
+        return [
+            (destination, cost)
+            for destination, cost, required, forbidden in self.moves[current_pos]
+            if occupied & required == required and not occupied & forbidden
+        ]
 
-            # We filter the possible movements according to the conditions of some of them
-            valid = True
-            if conditions:
-                for condition in conditions.split(","):
-                    condition = condition.strip()
-                    if condition.startswith("nobody"):
-                        node = condition[8:-1] # node = X where nobody(X)
-                        if node in state.kiwis or node in state.dogs:
-                            # Somebody is the node ---> movement NOT VALID
-                            valid = False
-                    elif condition.startswith("somebody"):
-                        node = condition[9:-1] # node = X where somebody(X)
-                        if node not in state.kiwis and node not in state.dogs:
-                            # There's no one in the node ---> movement NOT VALID
-                            valid = False
-            if valid:
-                # We take the valid movements
-                valid_pos.append((destination, cost))
-        return valid_pos
+    """
+    Returns the cost of moving an animal from current_pos to destination in the
+    given state, or None if there's no such edge or its conditions don't hold
+    """
+
+    def move_cost(self, current_pos, destination, state):
+        transition = self.transitions.get((current_pos, destination))
+        if transition is None:
+            return None
+        cost, required, forbidden = transition
+        occupied = self.occupied(state)
+        if occupied & required != required or occupied & forbidden:
+            return None
+        return cost
+
+    """
+    Yields the (state, action, cost) triples of every valid move_kiwi and
+    move_dog, in the same order and with the same labels as the actions, using
+    only the compiled adjacency index. Only the first of several animals of
+    the same kind on the same node is moved, since moving any of them leads to
+    the same (canonical) state
+    """
+
+    def iter_successors(self, state):
+        occupied = self.occupied(state)
+        for kind, positions in ((0, state.kiwis), (1, state.dogs)):
+            for animal_id, current_pos in enumerate(positions):
+                if animal_id > 0 and positions[animal_id - 1] == current_pos:
+                    continue
+                for destination, cost, required, forbidden in self.moves[current_pos]:
+                    if occupied & required == required and not occupied & forbidden:
+                        new_positions = positions[:animal_id] + (destination,) + positions[animal_id + 1:]
+                        if kind == 0:
+                            new_state = self.canonical(new_positions, state.dogs)
+                            label = f"move_kiwi({animal_id},{destination})"
+                        else:
+                            new_state = self.canonical(state.kiwis, new_positions)
+                            label = f"move_dog({animal_id},{destination})"
+                        yield new_state, label, cost
 
     ###############
     #   ACTIONS   #
     ###############
 
     """
-    The implementation of moving a kiwi action
-    !!! We need a dynamic cost because it depends on the source and destination parameters !!!
-        ---> Solution : return the cost of the action and the result state
+    Moves animal animal_id of the given kind ("kiwis" or "dogs") to
+    destination. Returns the cost of the move and the result state, or None
+    if there's no such edge or its conditions don't hold
     """
 
-    @action(
-        DDRange(0, 'num_kiwis'),
-        Categorical(["A", "B", "C", "D", "E", "F", "G"])
-    )
-    def move_kiwi(self, state, kiwi_id, destination):
-        # Get current position  and the possible destinations
-        current_pos = state.kiwis[kiwi_id]
-        valid_moves = self.get_valid_moves(current_pos, state)
+    def move_animal(self, state, kind, animal_id, destination):
+        # Get current position
+        positions = getattr(state, kind)
+        current_pos = positions[animal_id]
 
         # If destination is accessible from current position ---> YES : get the cost of the operation and continue
         #                                                    ---> NO  : Return None
-        move_cost = None
-        for dst, cost in valid_moves:
-            if dst == destination:
-                move_cost = cost
-                break
-
+        move_cost = self.move_cost(current_pos, destination, state)
         if move_cost is None:
             return None
 
-        # Set the new position of the kiwi we wanted to move and return ---> cost of the operation + the result state
-        new_kiwis = list(state.kiwis)
-        new_kiwis[kiwi_id] = destination
-        new_state = State(kiwis=tuple(new_kiwis), dogs=state.dogs)
+        # Set the new position of the animal we wanted to move and return ---> cost of the operation + the result state
+        new_positions = list(positions)
+        new_positions[animal_id] = destination
+        if kind == "kiwis":
+            new_state = self.canonical(new_positions, state.dogs)
+        else:
+            new_state = self.canonical(state.kiwis, new_positions)
 
         return move_cost, new_state
-    
+
     """
-    The implementation of moving a dog action
+    The implementation of moving a kiwi action (destination is the name of
+    a node in NODE_NAMES; graphs with other nodes get their own actions, see
+    graph_class)
+    !!! We need a dynamic cost because it depends on the source and destination parameters !!!
+        ---> Solution : return the cost of the action and the result state
+    """
+
+    @action(
+        DDRange(0, 'num_kiwis'),
+        Categorical(list(NODE_NAMES))
+    )
+    def move_kiwi(self, state, kiwi_id, destination):
+        return self.move_animal(state, "kiwis", kiwi_id, destination)
+
+    """
+    The implementation of moving a dog action (destination is the name of
+    a node in NODE_NAMES)
     !!! We need a dynamic cost because it depends on the source and destination parameters !!!
         ---> Solution : return the cost of the action and the result state
     """
 
     @action(
         DDRange(0, 'num_dogs'),
-        Categorical(["A", "B", "C", "D", "E", "F", "G"])
+        Categorical(list(NODE_NAMES))
     )
     def move_dog(self, state, dog_id, destination):
-        # Get current position  and the possible destinations
-        current_pos = state.dogs[dog_id]
-        valid_moves = self.get_valid_moves(current_pos, state)
+        return self.move_animal(state, "dogs", dog_id, destination)
 
-        # If destination is accessible from current position ---> YES : get the cost of the operation and continue
-        #                                                    ---> NO  : Return None
-        move_cost = None
-        for dst, cost in valid_moves:
-            if dst == destination:
-                move_cost = cost
-                break
 
-        if move_cost is None:
-            return None
+def graph_class(base, nodes):
+    """
+    Subclass of base whose move_kiwi/move_dog actions take the destination
+    among nodes (the node names of one instance), so that the action domain
+    matches its graph and the labels keep the node names. A new class is
+    built for every instance: nothing is shared between instances.
+    """
 
-        # Set the new position of the dog we wanted to move and return ---> cost of the operation + the result state
-        new_dogs = list(state.dogs)
-        new_dogs[dog_id] = destination
-        new_state = State(kiwis=state.kiwis, dogs=tuple(new_dogs))
+    class GraphProblem(base):
+        NODE_NAMES = nodes
 
-        return move_cost, new_state
+        @action(
+            DDRange(0, 'num_kiwis'),
+            Categorical(list(nodes))
+        )
+        def move_kiwi(self, state, kiwi_id, destination):
+            return self.move_animal(state, "kiwis", kiwi_id, destination)
+
+        @action(
+            DDRange(0, 'num_dogs'),
+            Categorical(list(nodes))
+        )
+        def move_dog(self, state, dog_id, destination):
+            return self.move_animal(state, "dogs", dog_id, destination)
+
+        def __reduce__(self):
+            # The class can't be found by name, so rebuild it when unpickling
+            return rebuild_graph_problem, (base, nodes, self.__dict__)
+
+    GraphProblem.__name__ = base.__name__
+    GraphProblem.__qualname__ = base.__qualname__
+    return GraphProblem
+
+
+def rebuild_graph_problem(base, nodes, state):
+    problem = base.__new__(base)
+    problem.__class__ = graph_class(base, nodes)
+    problem.__dict__.update(state)
+    return problem
+
+
+# Heuristics
+##############################################################################
+
+
+@KiwisAndDogsProblem.heuristic
+class KiwisAndDogsDistanceHeuristic(Heuristic):
+    """
+    Sum of the relaxed shortest path cost of every kiwi to the kiwi goal and of
+    every dog to the dog goal. Every action moves a single animal along one
+    edge, so the heuristic is admissible and consistent. The costs to the
+    goals are looked up in dicts built from problem.distances on first use.
+    """
+
+    to_goal = None
+
+    def compute(self, state):
+        if self.to_goal is None:
+            problem = self.problem
+            kiwi_goal, dog_goal = problem.node_index[problem.kiwi_goal], problem.node_index[problem.dog_goal]
+            self.to_goal = (
+                {node: problem.distances[i][kiwi_goal] for i, node in enumerate(problem.nodes)},
+                {node: problem.distances[i][dog_goal] for i, node in enumerate(problem.nodes)},
+            )
+        to_kiwi_goal, to_dog_goal = self.to_goal
+        h = 0
+        for pos in state.kiwis:
+            h += to_kiwi_goal[pos]
+        for pos in state.dogs:
+            h += to_dog_goal[pos]
+        return h
+
+
+@KiwisAndDogsProblem.heuristic
+class KiwisAndDogsPDBHeuristic(Heuristic):
+    """
+    Additive pattern database with one pattern for the kiwis and one for the
+    dogs. The abstract problem of a pattern only has the animals of its kind:
+    somebody(X) conditions are dropped (an animal of the other kind could be on
+    X) and nobody(X) conditions are checked against the animals of the pattern
+    only. Every action moves an animal of a single pattern, so the sum of the
+    exact abstract costs is admissible and consistent, and it is never lower
+    than KiwisAndDogsDistanceHeuristic.
+
+    Each table is filled with a backward Dijkstra from the abstract goal and
+    stored in an array('d') indexed like the state codec (the sorted node
+    indexes as base num_nodes digits). A pattern whose table would exceed
+    max_entries falls back to the sum of relaxed distances.
+    """
+
+    max_entries = 1 << 22
+
+    tables = None
+
+    def compute(self, state):
+        if self.tables is None:
+            problem = self.problem
+            self.tables = (
+                self.build(problem.num_kiwis, problem.kiwi_goal),
+                self.build(problem.num_dogs, problem.dog_goal),
+            )
+        h = 0
+        for positions, (table, to_goal) in zip((state.kiwis, state.dogs), self.tables):
+            if table is None:
+                for pos in positions:
+                    h += to_goal[pos]
+            else:
+                code = 0
+                for pos in positions:
+                    code = code * self.num_nodes + self.problem.node_index[pos]
+                h += table[code]
+        return h
+
+    def build(self, num_animals, goal):
+        """
+        Returns (table | None, relaxed cost to goal per node) for a pattern of
+        num_animals animals that must reach goal
+        """
+        problem = self.problem
+        n = self.num_nodes = problem.num_nodes
+        goal_index = problem.node_index[goal]
+        to_goal = {node: problem.distances[i][goal_index] for i, node in enumerate(problem.nodes)}
+        if num_animals == 0:
+            return array("d", [0.0]), to_goal
+        if n ** num_animals > self.max_entries:
+            return None, to_goal
+
+        # Aristas invertidas: destino → [(origen, coste, nodos que deben estar vacíos)]
+        incoming = [[] for _ in range(n)]
+        for (source, destination), (cost, _, forbidden) in problem.transitions.items():
+            incoming[problem.node_index[destination]].append((problem.node_index[source], cost, forbidden))
+
+        def encode(positions):
+            code = 0
+            for pos in positions:
+                code = code * n + pos
+            return code
+
+        table = array("d", [math.inf]) * n ** num_animals
+        start = (goal_index,) * num_animals
+        table[encode(start)] = 0
+        heap = [(0, start)]
+        while heap:
+            d, positions = heapq.heappop(heap)
+            if d > table[encode(positions)]:
+                continue
+            # Predecesores: un animal en v llegó desde u por la arista (u, v)
+            for i, v in enumerate(positions):
+                if i > 0 and positions[i - 1] == v:
+                    continue
+                for u, cost, forbidden in incoming[v]:
+                    previous = tuple(sorted(positions[:i] + (u,) + positions[i + 1:]))
+                    occupied = 0
+                    for pos in previous:
+                        occupied |= 1 << pos
+                    if occupied & forbidden:
+                        continue
+                    code = encode(previous)
+                    if d + cost < table[code]:
+                        table[code] = d + cost
+                        heapq.heappush(heap, (d + cost, previous))
+        return table, to_goal
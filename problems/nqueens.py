@@ -1,4 +1,3 @@
-import pygame
 import random
 
 from typing import Any
@@ -9,6 +8,8 @@ from hlogedu.search.visualizer import SolutionVisualizer
 
 # Visualization (you do not have to modify this!)
 ###########################################################################
+# pygame is imported inside the drawing methods so that headless use of the
+# problem (search, batch solving) does not load it
 
 
 class NQueensVisualizer(SolutionVisualizer):
@@ -16,6 +17,7 @@ class NQueensVisualizer(SolutionVisualizer):
 
     def draw_state(self, state: Any) -> None:
         """Draw a board with queens placed according to the given state."""
+        import pygame
         n = self.problem.n_queens
         cell_size = self.get_cell_size()
 
@@ -44,6 +46,7 @@ class NQueensVisualizer(SolutionVisualizer):
 
     def animate_transition(self, state: Any, action: Any, new_state: Any) -> None:
         """Smoothly animate the transition from one state to another."""
+        import pygame
         n = self.problem.n_queens
         cell_size = self.get_cell_size()
         delay = self.get_delay()
@@ -77,6 +80,7 @@ class NQueensVisualizer(SolutionVisualizer):
 
     def draw_interpolated_state(self, state) -> None:
         """Draw state where row positions can be floats (for animation)."""
+        import pygame
         n = self.problem.n_queens
         cell_size = self.get_cell_size()
 
@@ -102,6 +106,116 @@ class NQueensVisualizer(SolutionVisualizer):
         pygame.display.flip()
 
 
+# Board representation
+##############################################################################
+
+
+class Board(tuple):
+    """Queen rows (one per column) with cached conflict information.
+
+    Besides the rows, a board knows its number of attacking pairs and keeps one
+    queen counter per row, diagonal (col - row) and anti-diagonal (col + row).
+    Boards obtained with moved() compute their pairs in O(1) from the parent
+    counters and only build their own counters when they are first needed.
+    """
+
+    def __new__(cls, rows):
+        return super().__new__(cls, rows)
+
+    def __reduce__(self):
+        return Board.from_rows, (tuple(self),)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a board (and its counters) from scratch in O(n)"""
+        board = cls(rows)
+        n = len(board)
+        row_count, diag_count, anti_count = [0] * n, [0] * (2 * n - 1), [0] * (2 * n - 1)
+        for col, row in enumerate(board):
+            if not 0 <= row < n:
+                raise ValueError(f"Queen {col} is outside the board: row {row}")
+            row_count[row] += 1
+            diag_count[col - row + n - 1] += 1
+            anti_count[col + row] += 1
+        board._counters = (row_count, diag_count, anti_count)
+        board._parent = board._move = None
+        board.pairs = sum(
+            k * (k - 1) // 2 for line in board._counters for k in line if k > 1
+        )
+        return board
+
+    @property
+    def counters(self):
+        """(rows, diagonals, anti-diagonals) queen counters"""
+        if self._counters is None:
+            parent = self._parent
+            if parent is None or parent._counters is None:
+                self._counters = Board.from_rows(self)._counters
+            else:
+                col, new_row = self._move
+                self._counters = tuple(list(line) for line in parent._counters)
+                Board.shift(self._counters, col, parent[col], new_row)
+            self._parent = self._move = None
+        return self._counters
+
+    def forget_counters(self):
+        """Free the counters (they are rebuilt from scratch if needed again)"""
+        self._counters = None
+        self._parent = self._move = None
+
+    @staticmethod
+    def attacks(counters, col, row):
+        """Queens on the row and diagonals of square (col, row), counting one
+        that is on the square itself three times, O(1)"""
+        row_count, diag_count, anti_count = counters
+        return row_count[row] + diag_count[col - row + len(row_count) - 1] + anti_count[col + row]
+
+    @staticmethod
+    def shift(counters, col, old_row, new_row):
+        """Update the counters in place for the queen in col moving from
+        old_row to new_row, O(1)"""
+        row_count, diag_count, anti_count = counters
+        n = len(row_count)
+        row_count[old_row] -= 1
+        diag_count[col - old_row + n - 1] -= 1
+        anti_count[col + old_row] -= 1
+        row_count[new_row] += 1
+        diag_count[col - new_row + n - 1] += 1
+        anti_count[col + new_row] += 1
+
+    @staticmethod
+    def counters_delta(counters, col, old_row, new_row):
+        """Change in attacking pairs if the queen in col moves from old_row to
+        new_row, given the counters of the board before the move, O(1)
+
+        The old and new squares share no row, diagonal or anti-diagonal (they
+        are in the same column), so both terms can be read from these counters.
+        """
+        return Board.attacks(counters, col, new_row) - (Board.attacks(counters, col, old_row) - 3)
+
+    def queen_conflicts(self, col):
+        """Number of queens attacking the queen in column col, O(1)"""
+        return Board.attacks(self.counters, col, self[col]) - 3
+
+    def delta(self, col, new_row):
+        """Change in attacking pairs if the queen in col moves to new_row, O(1)"""
+        return Board.counters_delta(self.counters, col, self[col], new_row)
+
+    def moved(self, col, new_row, pairs=None):
+        """Board with the queen in col moved to new_row (counters built lazily)
+
+        pairs: attacking pairs of the new board, if the caller already knows
+        them (then this board's counters are not needed)
+        """
+        rows = list(self)
+        rows[col] = new_row
+        board = Board(rows)
+        board.pairs = self.pairs + self.delta(col, new_row) if pairs is None else pairs
+        board._counters = None
+        board._parent, board._move = self, (col, new_row)
+        return board
+
+
 # Problem
 ##############################################################################
 
@@ -131,25 +245,43 @@ class NQueensIterativeRepair(Problem):
         self.n_queens = n_queens
         self.seed = seed
         self.b_size = max(4, self.n_queens)
-        random.seed(self.seed)
+
+    def instance_key(self):
+        """
+        Parameters that determine the instance (for algorithms.solution_cache)
+        """
+        return f"{self.n_queens}:{self.seed}"
 
     def get_start_states(self):
         """
         Returns a tuple containing random numbers representing the row where 
-        each queen is placed
+        each queen is placed (drawn from the seed, so every call returns the
+        same board)
         """
-        return [tuple(random.randint(0, self.b_size - 1) for _ in range(self.b_size))]
+        rng = random.Random(self.seed)
+        return [Board.from_rows(rng.randint(0, self.b_size - 1) for _ in range(self.b_size))]
+
+    def board(self, state):
+        """
+        Returns the state as a Board, building its counters if it is a plain tuple
+        """
+        if isinstance(state, Board):
+            return state
+        return Board.from_rows(state)
 
     def is_goal_state(self, state):
         """
         Returns True if all queens have 0 conflicts with other queens
         """
-        return all(self.conflicts(state, col) == 0 for col in range(len(state)))
+        return self.board(state).pairs == 0
 
     def is_valid_state(self, state):
         """
         Checks if any queen is outside the board
         """
+        if isinstance(state, Board):
+            # Boards can only be built with every queen inside the board
+            return True
         for row in state:
             if row < 0 or row > len(state) - 1:
                 return False
@@ -159,17 +291,7 @@ class NQueensIterativeRepair(Problem):
         """
         Count the amount of conflicts of a given queen
         """
-        n = len(state)
-        conflicts_num = 0
-
-        for col2 in range(n):
-            if col == col2:
-                continue
-            
-            if state[col] == state[col2] or abs(col - col2) == abs(state[col] - state[col2]):
-                conflicts_num += 1
-        
-        return conflicts_num
+        return self.board(state).queen_conflicts(col)
 
     # Actions go here...
     @action(
@@ -183,9 +305,37 @@ class NQueensIterativeRepair(Problem):
         """
         if state[col] == new_row:
             return None
-        new_state = list(state)
-        new_state[col] = new_row
-        return tuple(new_state)
+        return self.board(state).moved(col, new_row)
+
+    def iter_successors(self, state):
+        """
+        Yields the (state, action, cost) triples of every move_queen that
+        actually moves a queen, without going through the action dispatch
+        """
+        board = self.board(state)
+        for col in range(self.b_size):
+            row = board[col]
+            for new_row in range(self.b_size):
+                if new_row != row:
+                    yield board.moved(col, new_row), f"move_queen({col},{new_row})", 1
+
+    def apply(self, state, label):
+        """
+        Returns the (state, cost) reached by applying the move_queen with the
+        given label to state, or None if it does not apply. Used by
+        algorithms.replay to follow a solution without generating every
+        successor of its states
+        """
+        name, _, args = str(label).partition("(")
+        if name != "move_queen" or not args.endswith(")"):
+            return None
+        try:
+            col, new_row = map(int, args[:-1].split(","))
+        except ValueError:
+            return None
+        if not (0 <= col < self.b_size and 0 <= new_row < self.b_size) or state[col] == new_row:
+            return None
+        return self.board(state).moved(col, new_row), 1
 
 
 # Heuristic
@@ -197,11 +347,8 @@ class RepairHeuristic(Heuristic):
 
     def compute(self, state):
         """
-        Returns the number of total conflicts in the board
+        Returns the number of total conflicts in the board, i.e. the sum of the
+        conflicts of every queen (twice the number of attacking pairs)
         """
-        n = len(state)
-        total = 0
-        for col in range(n):
-            total += self.problem.conflicts(state, col)
-        return total
+        return 2 * self.problem.board(state).pairs
 
@@ -1,8 +1,18 @@
-import pygame
+import functools
+import hashlib
 import math
+import mmap
+import os
+import struct
 
+from collections import OrderedDict
 from typing import Any
 
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback for the grid tables
+    np = None
+
 from hlogedu.search.problem import Problem, action, Categorical, Heuristic
 from hlogedu.search.visualizer import SolutionVisualizer
 from hlogedu.search.common import ClassParameter
@@ -11,6 +21,8 @@ import math
 
 # Visualization (you do not have to modify this!)
 ##############################################################################
+# pygame is imported inside the drawing methods so that headless use of the
+# problem (search, batch solving) does not load it
 
 
 class PacmanVisualizer(SolutionVisualizer):
@@ -23,6 +35,7 @@ class PacmanVisualizer(SolutionVisualizer):
         self.last_action = "move(R)"  # default direction
 
     def draw_state(self, state: Any, mouth_angle: float = 0.25):
+        import pygame
         (pac_r, pac_c), food = state
         self.screen.fill((0, 0, 0))
 
@@ -49,6 +62,7 @@ class PacmanVisualizer(SolutionVisualizer):
         draw_pacman(self.screen, pac_rect.center, radius, mouth_angle, self.last_action)
 
     def animate_transition(self, state: Any, action: Any, new_state: Any):
+        import pygame
         (r1, c1), food = state
         (r2, c2), _ = new_state
 
@@ -68,6 +82,7 @@ class PacmanVisualizer(SolutionVisualizer):
             pygame.time.delay(self.get_delay())
 
     def draw_maze_walls(self):
+        import pygame
         wall_blue = (0, 0, 255)
         bg_color = (20, 20, 40)  # dark navy background
         thickness = max(2, self.cell_size // 5)
@@ -117,6 +132,7 @@ def draw_pacman(surface, center, radius, mouth_angle, direction):
     mouth_angle: how wide the mouth is (in radians).
     direction: one of "U", "D", "L", "R".
     """
+    import pygame
     x, y = center
     # Base rotation in radians
     angles = {
@@ -139,6 +155,216 @@ def draw_pacman(surface, center, radius, mouth_angle, direction):
     pygame.draw.polygon(surface, (0, 0, 0), [p1, p2, p3])
 
 
+# Maze files
+##############################################################################
+
+WALL = ord("%")
+# bytes.translate table: 1 for walls, 0 for any other character
+WALL_BYTES = bytes(int(b == WALL) for b in range(256))
+
+
+class Maze:
+    """
+    Maze file loaded through a memory map. The markers are located with
+    bytes.find and the rows are checked to have the same width, without
+    building one string per row. Files with trailing blanks on their rows or
+    blank lines around the maze are normalized into a copy first. Attributes:
+      rows, cols: size of the maze
+      start: position of the (last) 'P'
+      foods: positions of the '.' in file order
+      walls[r][c]: truthy for walls (a 2-D NumPy bool array, or a list of
+        bytes rows of 0/1 without NumPy)
+      cells[r][c]: zero-copy view of the character codes of the file (a 2-D
+        NumPy view, or a list of memoryview rows without NumPy); None when
+        the maze was loaded from the binary cache
+
+    With cache=True the walls and markers are also stored in a binary file
+    next to the maze (path + ".cache"), which later loads map directly as long
+    as the modification time and size of the maze file do not change.
+    """
+
+    CACHE_MAGIC = b"PMZ1"
+    # magic, mtime_ns, tamaño del fichero, filas, columnas, inicio (fila, col), nº de comidas
+    CACHE_HEADER = struct.Struct("<4sqqiiiii")
+    CACHE_FOOD = struct.Struct("<ii")
+
+    def __init__(self, path, cache=False):
+        self.path = path
+        self.cells = None
+        if cache and self.load_cache():
+            return
+        self.load_text()
+        if cache:
+            self.write_cache()
+
+    def load_text(self):
+        with open(self.path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                raise ValueError(f"{self.path}: empty maze file")
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.parse(data)
+        except ValueError:
+            # Filas con espacios al final o líneas en blanco al principio o al
+            # final (que el cargador de texto aceptaba): se normalizan en
+            # memoria y se vuelve a intentar
+            rows = [line.rstrip() for line in data[:].splitlines()]
+            while rows and not rows[0]:
+                rows.pop(0)
+            while rows and not rows[-1]:
+                rows.pop()
+            self.parse(b"\n".join(rows))
+
+    def parse(self, data):
+        """
+        Loads the maze from the bytes of the file (rows of the same width,
+        with Unix or Windows line endings)
+        """
+        # Ignorar los saltos de línea al final del fichero
+        end = len(data)
+        while end > 0 and data[end - 1] in b"\r\n":
+            end -= 1
+        if end == 0:
+            raise ValueError(f"{self.path}: empty maze file")
+
+        # Ancho de las filas a partir de la primera (admite finales \n y \r\n)
+        first = data.find(b"\n", 0, end)
+        eol = 2 if first > 0 and data[first - 1] == ord("\r") else 1
+        cols = (end if first < 0 else first - eol + 1)
+        stride = cols + eol
+
+        # Validar que todas las filas tienen el mismo ancho
+        rows = 0
+        start = 0
+        while True:
+            nl = data.find(b"\n", start, end)
+            width = (end if nl < 0 else nl - eol + 1) - start
+            if width != cols:
+                raise ValueError(
+                    f"{self.path}: row {rows + 1} has {width} columns, expected {cols}"
+                )
+            rows += 1
+            if nl < 0:
+                break
+            start = nl + 1
+
+        pacman = data.rfind(b"P", 0, end)
+        if pacman < 0:
+            raise ValueError("Grid must contain 'P' for Pacman start")
+        foods = []
+        i = data.find(b".", 0, end)
+        while i >= 0:
+            foods.append(divmod(i, stride))
+            i = data.find(b".", i + 1, end)
+        if not foods:
+            raise ValueError("Grid must contain '.' for food")
+
+        self.rows, self.cols = rows, cols
+        self.start = divmod(pacman, stride)
+        self.foods = tuple(foods)
+        if np is not None:
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            self.cells = np.lib.stride_tricks.as_strided(
+                buffer, shape=(rows, cols), strides=(stride, 1), writeable=False
+            )
+            self.walls = self.cells == WALL
+        else:
+            view = memoryview(data)
+            self.cells = [view[r * stride:r * stride + cols] for r in range(rows)]
+            self.walls = [row.tobytes().translate(WALL_BYTES) for row in self.cells]
+
+    def cache_path(self):
+        return self.path + ".cache"
+
+    def load_cache(self):
+        """
+        Loads the binary cache if it is up to date; returns whether it did
+        """
+        try:
+            stat = os.stat(self.path)
+            with open(self.cache_path(), "rb") as fh:
+                data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        header = self.CACHE_HEADER
+        if len(data) < header.size:
+            return False
+        magic, mtime_ns, size, rows, cols, start_r, start_c, n_foods = header.unpack_from(data)
+        offset = header.size + n_foods * self.CACHE_FOOD.size
+        if (magic != self.CACHE_MAGIC or (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size)
+                or len(data) != offset + rows * cols):
+            return False
+
+        self.rows, self.cols = rows, cols
+        self.start = (start_r, start_c)
+        self.foods = tuple(
+            self.CACHE_FOOD.unpack_from(data, header.size + i * self.CACHE_FOOD.size)
+            for i in range(n_foods)
+        )
+        if np is not None:
+            self.walls = np.frombuffer(data, dtype=np.bool_, offset=offset).reshape(rows, cols)
+        else:
+            view = memoryview(data)[offset:]
+            self.walls = [view[r * cols:(r + 1) * cols] for r in range(rows)]
+        return True
+
+    def write_cache(self):
+        """
+        Writes the binary cache (best effort: errors such as a read-only
+        directory are ignored, the cache is only an optimization)
+        """
+        stat = os.stat(self.path)
+        if np is not None:
+            walls = self.walls.astype(np.uint8).tobytes()
+        else:
+            walls = b"".join(self.walls)
+        tmp = f"{self.cache_path()}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(self.CACHE_HEADER.pack(
+                    self.CACHE_MAGIC, stat.st_mtime_ns, stat.st_size,
+                    self.rows, self.cols, *self.start, len(self.foods),
+                ))
+                for food in self.foods:
+                    fh.write(self.CACHE_FOOD.pack(*food))
+                fh.write(walls)
+            os.replace(tmp, self.cache_path())
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def text_rows(self):
+        """
+        Rows as strings with '%' for walls, ' ' for free cells and the 'P' and
+        '.' markers
+        """
+        rows = [
+            "".join("%" if wall else " " for wall in row)
+            for row in (self.walls.tolist() if np is not None else self.walls)
+        ]
+        for r, c in self.foods:
+            rows[r] = rows[r][:c] + "." + rows[r][c + 1:]
+        r, c = self.start
+        rows[r] = rows[r][:c] + "P" + rows[r][c + 1:]
+        return rows
+
+
+class CellTable(dict):
+    """
+    cell -> build(cell), computed on first access
+    """
+
+    def __init__(self, build):
+        super().__init__()
+        self.build = build
+
+    def __missing__(self, cell):
+        value = self[cell] = self.build(cell)
+        return value
+
+
 # Problem
 ##############################################################################
 
@@ -155,30 +381,141 @@ class PacmanProblem(Problem):
         )
     ]
 
-    def __init__(self, file: str):
-        with open(file) as fh:
-            self.grid = [line.strip() for line in fh]
-
-        self.rows = len(self.grid)
-        self.cols = len(self.grid[0])
-
-        start = None
-        food = None
-
-        for r, row in enumerate(self.grid):
-            for c, ch in enumerate(row):
-                if ch == "P":
-                    start = (r, c)
-                elif ch == ".":
-                    food = (r, c)
-
-        if start is None:
-            raise ValueError("Grid must contain 'P' for Pacman start")
-        if food is None:
-            raise ValueError("Grid must contain '.' for food")
+    # (direction, row delta, col delta, action label)
+    DIRECTIONS = (
+        ("U", -1, 0, "move(U)"),
+        ("D", 1, 0, "move(D)"),
+        ("L", 0, -1, "move(L)"),
+        ("R", 0, 1, "move(R)"),
+    )
+
+    def __init__(self, file: str, cache: bool = False):
+        self.file = file
+        self.maze = Maze(file, cache)
+        self.rows = self.maze.rows
+        self.cols = self.maze.cols
+
+        # state = (pacman_position, food_position | None); the last '.' wins
+        self.food = self.maze.foods[-1]
+        self.start_state = (self.maze.start, self.food)
+        self.compile_grid()
+
+    def instance_key(self):
+        """
+        Content hash of the maze file (for algorithms.solution_cache)
+        """
+        with open(self.file, "rb") as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+
+    @functools.cached_property
+    def grid(self):
+        """
+        Maze rows as strings, only built when needed (by the visualizer)
+        """
+        return self.maze.text_rows()
+
+    def compile_grid(self):
+        """
+        Precomputes the maze tables used by the successor functions:
+          walls[r][c]: truthy for walls (see Maze)
+          neighbours[cell][k]: cell reached from cell = r * cols + c by
+            DIRECTIONS[k], -1 if blocked (or if cell is a wall)
+          moves[cell]: tuple with the position reached per direction (or None)
+          exits[cell]: tuple of (position, action label) of the valid moves
+        walls and neighbours are NumPy arrays when NumPy is available. moves
+        and exits (and neighbours without NumPy) are filled on first access to
+        each cell, so that large mazes only pay for the cells the search visits.
+        """
+        rows, cols = self.rows, self.cols
+        walls = self.maze.walls
+        if np is not None:
+            free = ~walls
+            index = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+            neighbours = np.full((rows, cols, len(self.DIRECTIONS)), -1, dtype=np.int32)
+            for k, (_, dr, dc, _) in enumerate(self.DIRECTIONS):
+                # Celdas origen y destino desplazadas (dr, dc) dentro del tablero
+                src = (slice(max(0, -dr), rows - max(0, dr)), slice(max(0, -dc), cols - max(0, dc)))
+                dst = (slice(max(0, dr), rows - max(0, -dr)), slice(max(0, dc), cols - max(0, -dc)))
+                ok = free[src] & free[dst]
+                neighbours[src + (k,)] = np.where(ok, index[dst], -1)
+            neighbours = neighbours.reshape(rows * cols, len(self.DIRECTIONS))
+        else:
+            # Sin NumPy, los vecinos de cada celda se calculan al primer acceso
+            def cell_neighbours(cell):
+                r, c = divmod(cell, cols)
+                result = []
+                for _, dr, dc, _ in self.DIRECTIONS:
+                    nr, nc = r + dr, c + dc
+                    ok = (not walls[r][c] and 0 <= nr < rows and 0 <= nc < cols
+                          and not walls[nr][nc])
+                    result.append(nr * cols + nc if ok else -1)
+                return result
+
+            neighbours = CellTable(cell_neighbours)
+        self.walls = walls
+        self.neighbours = neighbours
+
+        # Tablas de Python para los sucesores (más rápidas que indexar NumPy)
+        labels = [label for _, _, _, label in self.DIRECTIONS]
+
+        def cell_moves(cell):
+            return tuple(divmod(d, cols) if d >= 0 else None for d in self.neighbour_cells(cell))
+
+        def cell_exits(cell):
+            return tuple(
+                (divmod(d, cols), label)
+                for d, label in zip(self.neighbour_cells(cell), labels)
+                if d >= 0
+            )
 
-        # state = (pacman_position, food_position | None)
-        self.start_state = (start, food)
+        self.moves = CellTable(cell_moves)
+        self.exits = CellTable(cell_exits)
+
+    def neighbour_cells(self, cell):
+        neighbours = self.neighbours[cell]
+        return neighbours.tolist() if np is not None else neighbours
+
+    def is_free(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols and not self.walls[r][c]
+
+    def distance_map(self, target):
+        """
+        Maze distance from every cell to target (a (row, col) position), as a
+        rows x cols grid with -1 for walls and unreachable cells. Moves are
+        reversible, so it is also the distance from target to every cell. The
+        BFS is level-synchronous over the neighbours table (vectorized with
+        NumPy when available).
+        """
+        rows, cols = self.rows, self.cols
+        start = target[0] * cols + target[1]
+        if np is not None:
+            dist = np.full(rows * cols, -1, dtype=np.int32)
+            dist[start] = 0
+            frontier = np.array([start], dtype=np.int32)
+            d = 0
+            while frontier.size:
+                d += 1
+                nxt = self.neighbours[frontier].ravel()
+                nxt = nxt[nxt >= 0]
+                nxt = np.unique(nxt[dist[nxt] < 0])
+                dist[nxt] = d
+                frontier = nxt
+            return dist.reshape(rows, cols)
+
+        dist = [-1] * (rows * cols)
+        dist[start] = 0
+        frontier = [start]
+        d = 0
+        while frontier:
+            d += 1
+            nxt = []
+            for cell in frontier:
+                for n in self.neighbours[cell]:
+                    if n >= 0 and dist[n] < 0:
+                        dist[n] = d
+                        nxt.append(n)
+            frontier = nxt
+        return [dist[r * cols:(r + 1) * cols] for r in range(rows)]
 
     def get_start_states(self):
         return [self.start_state]
@@ -190,31 +527,234 @@ class PacmanProblem(Problem):
     def is_valid_state(self, _):
         return True
 
+    # State codec: (row * cols + col) * 2 + food bit
+    def num_state_codes(self):
+        return self.rows * self.cols * 2
+
+    def encode_state(self, state):
+        (r, c), food = state
+        return (r * self.cols + c) * 2 + (food is not None)
+
+    def decode_state(self, code):
+        cell, has_food = divmod(code, 2)
+        return (divmod(cell, self.cols), self.food if has_food else None)
+
+    DIRECTION_INDEX = {d: k for k, (d, _, _, _) in enumerate(DIRECTIONS)}
+
     @action(Categorical(["U", "D", "L", "R"]), cost=1)
     def move(self, state, direction):
         (r, c), food = state
-        if direction == "U":
-            r -= 1
-        elif direction == "D":
-            r += 1
-        elif direction == "L":
-            c -= 1
-        elif direction == "R":
-            c += 1
-        else:
+        k = self.DIRECTION_INDEX.get(direction)
+        if k is None:
             raise ValueError(f"Unknown action: {direction}")
 
-        new_food = food
-        if (r, c) == food:
-            new_food = None  # food eaten
+        pos = self.moves[r * self.cols + c][k]
+        if pos is None:
+            return None
+        if pos == food:
+            return (pos, None)  # food eaten
+        return (pos, food)
+
+    def iter_successors(self, state):
+        """
+        Yields the same (state, action, cost) triples as the move action, but
+        only for the directions that do not hit a wall
+        """
+        (r, c), food = state
+        for pos, label in self.exits[r * self.cols + c]:
+            yield (pos, None if pos == food else food), label, 1
+
+    # Reverse moves (for bidirectional search)
+    def get_goal_states(self):
+        return [(self.food, None)]
+
+    def get_predecessors(self, state):
+        """
+        Yields the (previous_state, action, cost) triples such that applying
+        action to previous_state leads to state. On the food cell only the
+        moves that eat the food are yielded: coming back to it after eating
+        it never leads to a shorter path, and those predecessors would open
+        the whole food-eaten layer of the maze to a backward search.
+        """
+        (r, c), food = state
+        if food is not None and (r, c) == food:
+            return  # unreachable: the food is eaten when pacman gets there
+        eats = food is None and (r, c) == self.food
+        for _, dr, dc, label in self.DIRECTIONS:
+            pr, pc = r - dr, c - dc
+            if self.is_free(pr, pc):
+                if eats:
+                    yield ((pr, pc), self.food), label, 1
+                elif food is None or (pr, pc) != food:
+                    yield ((pr, pc), food), label, 1
+
+# Multi-food problem
+##############################################################################
+
+
+class PacmanMultiFoodVisualizer(PacmanVisualizer):
+    def draw_state(self, state: Any, mouth_angle: float = 0.25):
+        import pygame
+        (pac_r, pac_c), eaten = state
+        self.screen.fill((0, 0, 0))
+
+        self.draw_maze_walls()
+
+        # draw the dots not eaten yet
+        for i, (fr, fc) in enumerate(self.problem.foods):
+            if eaten >> i & 1:
+                continue
+            food_rect = pygame.Rect(
+                fc * self.cell_size, fr * self.cell_size, self.cell_size, self.cell_size
+            )
+            pygame.draw.circle(
+                self.screen, (255, 255, 255), food_rect.center, self.cell_size // 6
+            )
+
+        # draw pacman
+        pac_rect = pygame.Rect(
+            pac_c * self.cell_size,
+            pac_r * self.cell_size,
+            self.cell_size,
+            self.cell_size,
+        )
+        radius = self.cell_size // 2 - 2
+        draw_pacman(self.screen, pac_rect.center, radius, mouth_angle, self.last_action)
+
+
+class PacmanMultiFoodProblem(PacmanProblem):
+    """
+    Pacman has to eat every '.' of the maze. Dot i is foods[i] and the state is
+    (pacman_position, eaten) where bit i of the integer eaten is set once dot i
+    has been eaten, so states that only differ in the order the dots were
+    eaten are the same state.
+    """
+
+    NAME = "Pacman-multi-food"
+    VISUALIZER = PacmanMultiFoodVisualizer
+
+    def __init__(self, file: str, cache: bool = False):
+        super().__init__(file, cache)
+        self.foods = self.maze.foods
+        self.food_index = {food: i for i, food in enumerate(self.foods)}
+        self.all_eaten = (1 << len(self.foods)) - 1
+        self.start_state = (self.start_state[0], 0)
+
+    def is_goal_state(self, state):
+        _, eaten = state
+        return eaten == self.all_eaten
+
+    # State codec: (row * cols + col) * 2^len(foods) + eaten
+    def num_state_codes(self):
+        return self.rows * self.cols << len(self.foods)
+
+    def encode_state(self, state):
+        (r, c), eaten = state
+        return (r * self.cols + c) << len(self.foods) | eaten
+
+    def decode_state(self, code):
+        cell = code >> len(self.foods)
+        return (divmod(cell, self.cols), code & self.all_eaten)
+
+    def eat(self, pos, eaten):
+        i = self.food_index.get(pos)
+        return eaten if i is None else eaten | 1 << i
+
+    @action(Categorical(["U", "D", "L", "R"]), cost=1)
+    def move(self, state, direction):
+        (r, c), eaten = state
+        k = self.DIRECTION_INDEX.get(direction)
+        if k is None:
+            raise ValueError(f"Unknown action: {direction}")
+
+        pos = self.moves[r * self.cols + c][k]
+        if pos is None:
+            return None
+        return (pos, self.eat(pos, eaten))
+
+    def iter_successors(self, state):
+        (r, c), eaten = state
+        for pos, label in self.exits[r * self.cols + c]:
+            yield (pos, self.eat(pos, eaten)), label, 1
+
+    def remaining_foods(self, eaten):
+        """
+        Cells of the dots not eaten yet
+        """
+        return [food for i, food in enumerate(self.foods) if not eaten >> i & 1]
+
+    # Reverse moves (for bidirectional search): the last dot is eaten on
+    # arrival, so pacman ends on a dot
+    def get_goal_states(self):
+        if not self.foods:
+            return [self.start_state]
+        return [(food, self.all_eaten) for food in self.foods]
+
+    def get_predecessors(self, state):
+        (r, c), eaten = state
+        i = self.food_index.get((r, c))
+        if i is not None and not eaten >> i & 1:
+            return  # unreachable: the dot is eaten when pacman gets there
+        # Si la casilla es un punto, pudo comerse en este mismo movimiento;
+        # con todos comidos solo interesa el movimiento que come el último
+        # (volver a un punto ya comido no acorta ningún camino)
+        if i is None:
+            previous = [eaten]
+        elif eaten == self.all_eaten:
+            previous = [eaten & ~(1 << i)]
+        else:
+            previous = [eaten, eaten & ~(1 << i)]
+        for _, dr, dc, label in self.DIRECTIONS:
+            pr, pc = r - dr, c - dc
+            if not self.is_free(pr, pc):
+                continue
+            j = self.food_index.get((pr, pc))
+            for prev in previous:
+                if j is None or prev >> j & 1:
+                    yield ((pr, pc), prev), label, 1
 
-        if 0 <= r <= self.rows and 0 <= c <= self.cols and self.grid[r][c] != "%":
-            return ((r, c), new_food)
-        return None
 
 # Heuristics
 ##############################################################################
 
+# Maze distances shared by every PacmanMazeDistanceHeuristic in the process:
+# (maze file, modification time, target cell) -> flat list indexed by r * cols + c.
+# It is an LRU of at most DISTANCE_CACHE_SIZE maps (one map of a 300x300 maze
+# takes ~0.7 MB); the heuristics keep their own references to the maps they use.
+DISTANCE_CACHE = OrderedDict()
+DISTANCE_CACHE_SIZE = 64
+
+
+def maze_distances(problem, target):
+    """
+    Cached problem.distance_map(target) as a flat list (-1 for walls and
+    unreachable cells)
+    """
+    path = os.path.realpath(problem.file)
+    key = (path, os.stat(path).st_mtime_ns, target)
+    distances = DISTANCE_CACHE.get(key)
+    if distances is not None:
+        DISTANCE_CACHE.move_to_end(key)
+        return distances
+    dist = problem.distance_map(target)
+    if np is not None:
+        distances = dist.ravel().tolist()
+    else:
+        distances = [d for row in dist for d in row]
+    DISTANCE_CACHE[key] = distances
+    if len(DISTANCE_CACHE) > DISTANCE_CACHE_SIZE:
+        DISTANCE_CACHE.popitem(last=False)
+    return distances
+
+
+"""
+The heuristics registered on PacmanProblem are inherited by
+PacmanMultiFoodProblem, whose states hold the eaten bitmask instead of the
+food cell: there they return the distance to the farthest remaining dot,
+which every path that eats all of them has to cover.
+"""
+
+
 @PacmanProblem.heuristic
 class PacmanManhattanHeuristic(Heuristic):
 
@@ -223,11 +763,34 @@ class PacmanManhattanHeuristic(Heuristic):
         
         if food is None:
             return 0
+
+        if not isinstance(food, tuple):
+            return max((abs(pac_x - food_x) + abs(pac_y - food_y)
+                        for food_x, food_y in self.problem.remaining_foods(food)), default=0)
         
         food_x, food_y = food
 
         return abs(pac_x - food_x) + abs(pac_y - food_y)
     
+class PacmanStartManhattanHeuristic(Heuristic):
+    """
+    Manhattan distance from the start to the state, through the food once it
+    has been eaten: the backward_heuristic of BidirectionalSearch. It is not
+    registered on the problem, since it does not estimate the cost to a goal.
+    """
+
+    def compute(self, state):
+        (pac_x, pac_y), food = state
+        start_x, start_y = self.problem.start_state[0]
+
+        if food is None:
+            food_x, food_y = self.problem.food
+            return (abs(start_x - food_x) + abs(start_y - food_y)
+                    + abs(food_x - pac_x) + abs(food_y - pac_y))
+
+        return abs(start_x - pac_x) + abs(start_y - pac_y)
+
+
 @PacmanProblem.heuristic
 class PacmanEuclideanHeuristic(Heuristic):
 
@@ -236,7 +799,110 @@ class PacmanEuclideanHeuristic(Heuristic):
         
         if food is None:
             return 0
+
+        if not isinstance(food, tuple):
+            return max((math.sqrt(abs(pac_x - food_x)**2 + abs(pac_y - food_y)**2)
+                        for food_x, food_y in self.problem.remaining_foods(food)), default=0)
         
         food_x, food_y = food
 
-        return math.sqrt(abs(pac_x - food_x)**2 + abs(pac_y - food_y)**2)
\ No newline at end of file
+        return math.sqrt(abs(pac_x - food_x)**2 + abs(pac_y - food_y)**2)
+
+
+@PacmanProblem.heuristic
+class PacmanMazeDistanceHeuristic(Heuristic):
+    """
+    Exact distance to the food through the maze (it takes the walls into
+    account). The distances of every cell are computed with one BFS from the
+    food on first use and cached per maze file and food cell, so other
+    instances of the same maze reuse them. With Graph_Astar(decrease_key=True),
+    which breaks f ties by h, A* only expands the nodes of an optimal path.
+    """
+
+    distances = None
+
+    def compute(self, state):
+        (pac_r, pac_c), food = state
+
+        if food is None:
+            return 0
+
+        if not isinstance(food, tuple):
+            return self.farthest_food(pac_r * self.problem.cols + pac_c, food)
+
+        if self.distances is None:
+            self.distances = maze_distances(self.problem, food)
+
+        d = self.distances[pac_r * self.problem.cols + pac_c]
+        return d if d >= 0 else math.inf
+
+    def farthest_food(self, cell, eaten):
+        """
+        Maze distance from cell to the farthest dot not eaten yet
+        (PacmanMultiFoodProblem states)
+        """
+        if self.distances is None:
+            self.distances = {food: maze_distances(self.problem, food) for food in self.problem.foods}
+        h = 0
+        for food in self.problem.remaining_foods(eaten):
+            d = self.distances[food][cell]
+            if d < 0:
+                return math.inf
+            h = max(h, d)
+        return h
+
+
+@PacmanMultiFoodProblem.heuristic
+class PacmanFoodMSTHeuristic(Heuristic):
+    """
+    Maze distance to the closest remaining dot plus the weight of a minimum
+    spanning tree of the remaining dots (edges weighted by maze distance).
+    Eating every dot requires reaching one of them and then walking a path
+    that connects all of them, which is at least as long as the MST, so the
+    heuristic is admissible. The distance maps of the dots come from the
+    shared distance cache and the MST weights are memoized per eaten bitmask.
+    """
+
+    distances = None
+
+    def compute(self, state):
+        (pac_r, pac_c), eaten = state
+
+        if eaten == self.problem.all_eaten:
+            return 0
+
+        if self.distances is None:
+            self.distances = [maze_distances(self.problem, food) for food in self.problem.foods]
+            self.mst_weights = {}
+
+        remaining = [i for i in range(len(self.problem.foods)) if not eaten >> i & 1]
+        cell = pac_r * self.problem.cols + pac_c
+        closest = min(self.distances[i][cell] for i in remaining)
+        if closest < 0:
+            return math.inf  # some dot is unreachable
+
+        mst = self.mst_weights.get(eaten)
+        if mst is None:
+            mst = self.mst_weights[eaten] = self.mst_weight(remaining)
+        return closest + mst
+
+    def mst_weight(self, remaining):
+        """
+        Prim's algorithm over the remaining dots
+        """
+        foods, cols = self.problem.foods, self.problem.cols
+        first, rest = remaining[0], remaining[1:]
+        # Distancia de cada punto restante al árbol construido hasta ahora
+        best = {j: self.distances[first][foods[j][0] * cols + foods[j][1]] for j in rest}
+        total = 0
+        while best:
+            j = min(best, key=best.get)
+            d = best.pop(j)
+            if d < 0:
+                return math.inf
+            total += d
+            for k in best:
+                dk = self.distances[j][foods[k][0] * cols + foods[k][1]]
+                if 0 <= dk < best[k]:
+                    best[k] = dk
+        return total
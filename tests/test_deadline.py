@@ -0,0 +1,16 @@
+from algorithms.astar import Deadline, Graph_Astar
+from problems.kiwis_and_dogs import KiwisAndDogsDistanceHeuristic, KiwisAndDogsProblem
+
+
+def test_zero_budget_is_reached_right_away():
+    assert Deadline(0)()
+    assert not Deadline(60)()
+
+
+def test_zero_deadline_expands_nothing():
+    problem = KiwisAndDogsProblem()
+    algorithm = Graph_Astar(problem)
+    solution = algorithm.run(heuristic=KiwisAndDogsDistanceHeuristic(problem), deadline=0)
+    assert solution.solution_node is None
+    assert solution.deadline_reached
+    assert algorithm.expand_counter == 0
@@ -0,0 +1,48 @@
+import heapq
+
+from problems.kiwis_and_dogs import KiwisAndDogsProblem, State
+
+
+def optimal_cost(problem):
+    """
+    Uniform-cost search over the action-based successors of the problem
+    """
+    fringe = [(0, start) for start in problem.get_start_states()]
+    best = {}
+    while fringe:
+        cost, state = heapq.heappop(fringe)
+        if problem.is_goal_state(state):
+            return cost
+        if best.get(state, float("inf")) <= cost:
+            continue
+        best[state] = cost
+        for successor, _, step in problem.get_successors(state):
+            heapq.heappush(fringe, (cost + step, successor))
+    return None
+
+
+def test_nobody_condition_blocks_move():
+    problem = KiwisAndDogsProblem()
+    # A -> B requires nobody(E): blocked while the dog is on E
+    blocked = State(kiwis=("A", "F"), dogs=("E",))
+    free = State(kiwis=("A", "F"), dogs=("C",))
+    assert "B" not in [destination for destination, _ in problem.get_valid_moves("A", blocked)]
+    assert "B" in [destination for destination, _ in problem.get_valid_moves("A", free)]
+
+
+def test_default_instance_optimal_cost():
+    # 77 when nobody(X) conditions were ignored
+    assert optimal_cost(KiwisAndDogsProblem()) == 97
+
+
+def test_custom_graph_actions_are_per_instance(tmp_path):
+    from benchmarks.instances import kiwis_and_dogs_random
+
+    default = KiwisAndDogsProblem()
+    custom = kiwis_and_dogs_random(str(tmp_path), 8, 1, 1, seed=3)()
+    state = custom.get_start_states()[0]
+    labels = {label for _, label, _ in custom.get_successors(state)}
+    assert labels == {label for _, label, _ in custom.iter_successors(state)}
+    # Nothing leaks into the built-in graph or its instances
+    assert KiwisAndDogsProblem.NODE_NAMES == ("A", "B", "C", "D", "E", "F", "G")
+    assert optimal_cost(default) == 97
@@ -0,0 +1,34 @@
+import pytest
+
+from algorithms.local_search import MinConflicts
+from problems.nqueens import NQueensIterativeRepair, RepairHeuristic
+
+
+def replay(problem, node):
+    """
+    Applies the actions of the path back from the start state
+    """
+    path = []
+    while node.parent is not None:
+        path.append(node)
+        node = node.parent
+    state = problem.get_start_states()[0]
+    assert tuple(node.state) == tuple(state)
+    for n in reversed(path):
+        state, _ = problem.apply(state, n.action)
+        assert tuple(state) == tuple(n.state)
+    return state
+
+
+@pytest.mark.parametrize("candidates", [1, 2, None])
+def test_solves_with_few_candidates(candidates):
+    problem = NQueensIterativeRepair(20, seed=3)
+    solution = MinConflicts(problem).run(RepairHeuristic(problem), max_steps=1000, candidates=candidates, seed=0)
+    assert solution.solution_node is not None
+    assert problem.is_goal_state(replay(problem, solution.solution_node))
+
+
+def test_rejects_no_candidates():
+    problem = NQueensIterativeRepair(8)
+    with pytest.raises(ValueError):
+        MinConflicts(problem).run(RepairHeuristic(problem), candidates=0)
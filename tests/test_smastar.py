@@ -0,0 +1,88 @@
+import pytest
+
+from algorithms.astar import Graph_Astar, Graph_SMAstar
+from problems.kiwis_and_dogs import KiwisAndDogsDistanceHeuristic, KiwisAndDogsProblem
+from problems.pacman import PacmanManhattanHeuristic, PacmanProblem
+
+MAZE = """\
+%%%%%%%%%%%%%%%%%%%%
+%P       %%   %    %
+% %%     %        %%
+%   %  %           %
+%  %   %          %%
+%%    %            %
+% %        %  %    %
+%    % %        %%%%
+%  %  %% %     %  %%
+%%     %%% %       %
+%      %          .%
+%%%%%%%%%%%%%%%%%%%%
+"""
+
+# benchmarks.instances.pacman_random(..., 10, 10, wall_prob=0.3, seed=10): a
+# stale leaf dropped while generating a cheaper path used to kill the root
+BRANCHING_MAZE = """\
+%%%%%%%%%%
+%P  %   %%
+%  %  %  %
+% %    % %
+%   %%%  %
+%     %  %
+%%%      %
+% %   % %%
+%%      .%
+%%%%%%%%%%
+"""
+
+
+@pytest.fixture
+def maze(tmp_path):
+    path = tmp_path / "small.lay"
+    path.write_text(MAZE)
+    return PacmanProblem(str(path))
+
+
+@pytest.fixture
+def branching_maze(tmp_path):
+    path = tmp_path / "branching.lay"
+    path.write_text(BRANCHING_MAZE)
+    return PacmanProblem(str(path))
+
+
+def cost(solution):
+    n = solution.solution_node
+    return None if n is None else n.cost
+
+
+@pytest.mark.parametrize("max_nodes", [27, 30, 40, 1000])
+def test_optimal_within_budget(maze, max_nodes):
+    # The optimal path has 26 moves, i.e. 27 nodes
+    heuristic = PacmanManhattanHeuristic(maze)
+    algorithm = Graph_SMAstar(maze)
+    solution = algorithm.run(heuristic=heuristic, max_nodes=max_nodes)
+    assert cost(solution) == cost(Graph_Astar(maze).run(heuristic=heuristic)) == 26
+    assert solution.peak_nodes <= max_nodes
+
+
+@pytest.mark.parametrize("max_nodes", [5, 10, 15])
+def test_fails_when_the_path_does_not_fit(maze, max_nodes):
+    algorithm = Graph_SMAstar(maze)
+    solution = algorithm.run(heuristic=PacmanManhattanHeuristic(maze), max_nodes=max_nodes)
+    assert solution.solution_node is None
+    assert solution.peak_nodes <= max_nodes
+
+
+@pytest.mark.parametrize("max_nodes", [15, 17, 28, 200])
+def test_cheaper_path_to_a_live_leaf(branching_maze, max_nodes):
+    heuristic = PacmanManhattanHeuristic(branching_maze)
+    solution = Graph_SMAstar(branching_maze).run(heuristic=heuristic, max_nodes=max_nodes)
+    assert cost(solution) == cost(Graph_Astar(branching_maze).run(heuristic=heuristic)) == 14
+    assert solution.peak_nodes <= max_nodes
+
+
+def test_kiwis_and_dogs_budget():
+    problem = KiwisAndDogsProblem()
+    algorithm = Graph_SMAstar(problem)
+    solution = algorithm.run(heuristic=KiwisAndDogsDistanceHeuristic(problem), max_nodes=100)
+    assert cost(solution) == 97
+    assert solution.peak_nodes <= 100